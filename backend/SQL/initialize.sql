@@ -14,23 +14,63 @@
 
  ALTER TABLE sources ENABLE ROW LEVEL SECURITY;
 
+ -- Covering index for the sources listing: the type filter + newest-first
+ -- order become an index range scan, and INCLUDE lets it answer the
+ -- selected columns without touching the heap
+ CREATE INDEX idx_sources_type_time ON sources (source_type, processed_at DESC)
+   INCLUDE (source_id, session_info, chunk_count);
+
  -- Embeddings table (RLS enabled, service role only)
+ -- halfvec stores float16 components: half the bytes of VECTOR with
+ -- negligible recall loss for cosine ranking
  CREATE TABLE embeddings (
    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
    source_id UUID REFERENCES sources(id) ON DELETE CASCADE,
    text TEXT NOT NULL,
    timestamp TEXT,
-   embedding VECTOR(1536)
+   embedding HALFVEC(1536)
  );
 
  -- Index for similarity search
- CREATE INDEX ON embeddings USING hnsw (embedding vector_cosine_ops);
+ CREATE INDEX ON embeddings USING hnsw (embedding halfvec_cosine_ops);
+
+ -- Migration for databases created before the halfvec switch:
+ --   ALTER TABLE embeddings ALTER COLUMN embedding TYPE HALFVEC(1536);
+ --   (then recreate the hnsw index with halfvec_cosine_ops and
+ --    re-create match_embeddings with the HALFVEC signature below)
+ --
+ -- Migration for existing databases missing the newer objects: run the
+ -- idx_sources_type_time CREATE INDEX above and the delete_source_cascade
+ -- CREATE OR REPLACE FUNCTION below on the live database. The API's
+ -- DELETE /sources/{id} calls the function and 500s until it exists.
 
  ALTER TABLE embeddings ENABLE ROW LEVEL SECURITY;
 
+-- Delete a source and its embeddings in one round trip, inside one
+-- transaction. The FK cascade would remove the rows anyway, but the
+-- explicit delete lets the API report how many embeddings went.
+-- Returns NULL when the source does not exist.
+CREATE OR REPLACE FUNCTION delete_source_cascade(source_uuid UUID)
+  RETURNS INT
+  LANGUAGE plpgsql
+  SET search_path = public
+  AS $$
+  DECLARE
+    embeddings_deleted INT;
+  BEGIN
+    DELETE FROM embeddings WHERE source_id = source_uuid;
+    GET DIAGNOSTICS embeddings_deleted = ROW_COUNT;
+    DELETE FROM sources WHERE id = source_uuid;
+    IF NOT FOUND THEN
+      RETURN NULL;
+    END IF;
+    RETURN embeddings_deleted;
+  END;
+  $$;
+
 -- Function for similarity search with optional session filter
 CREATE OR REPLACE FUNCTION match_embeddings(
-    query_embedding VECTOR(1536),
+    query_embedding HALFVEC(1536),
     match_count INT DEFAULT 5,
     session_filter TEXT DEFAULT NULL
   )
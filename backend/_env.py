@@ -0,0 +1,14 @@
+"""
+One-time .env loading shared by the app and the action CLIs.
+
+Importing this module loads the repository root .env exactly once per
+process; repeated imports are free, so call sites no longer redo the
+path math or re-read the file from disk. Import it before any module
+that reads environment variables at import time (e.g. the clients).
+"""
+
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv(Path(__file__).resolve().parents[1] / ".env")
@@ -0,0 +1,57 @@
+"""
+Numba-accelerated cosine similarity kernels for bulk/rerank workloads.
+
+Single-query search stays on the BLAS matmul in services.local_search; these
+kernels cover matrix-matrix shapes (multi-query reranking, evaluation runs)
+where a loop-parallelized fused multiply-add over contiguous float32 rows
+beats generic BLAS. Numba is optional: without it the functions fall back to
+plain NumPy with the same signatures.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def cosine_matrix(queries, corpus):
+        """Pairwise cosine similarity between rows of two float32 matrices."""
+        out = np.empty((queries.shape[0], corpus.shape[0]), dtype=np.float32)
+        dims = queries.shape[1]
+        for i in prange(queries.shape[0]):
+            query = queries[i]
+            query_norm = 0.0
+            for k in range(dims):
+                query_norm += query[k] * query[k]
+            for j in range(corpus.shape[0]):
+                row = corpus[j]
+                dot = 0.0
+                row_norm = 0.0
+                for k in range(dims):
+                    dot += query[k] * row[k]
+                    row_norm += row[k] * row[k]
+                out[i, j] = dot / np.sqrt(query_norm * row_norm)
+        return out
+
+else:
+
+    def cosine_matrix(queries, corpus):
+        """Pairwise cosine similarity between rows of two matrices (NumPy fallback)."""
+        queries = np.asarray(queries, dtype=np.float32)
+        corpus = np.asarray(corpus, dtype=np.float32)
+        query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        corpus_norms = np.linalg.norm(corpus, axis=1, keepdims=True)
+        return (queries @ corpus.T) / (query_norms * corpus_norms.T)
+
+
+def cosine_vector(query, corpus) -> np.ndarray:
+    """Cosine similarity of one query vector against every corpus row."""
+    query = np.ascontiguousarray(query, dtype=np.float32)
+    corpus = np.ascontiguousarray(corpus, dtype=np.float32)
+    return cosine_matrix(query.reshape(1, -1), corpus)[0]
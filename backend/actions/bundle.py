@@ -3,6 +3,20 @@ import re
 from pathlib import Path
 from typing import List, Dict, Any
 
+import numpy as np
+
+try:
+    # Optional: C-accelerated JSON, 2-5x faster than stdlib on these payloads
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # Optional: approximate nearest-neighbor index for sub-linear search
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 EMBEDDINGS_DIR = PROJECT_ROOT / "embeddings"
@@ -10,6 +24,7 @@ BUNDLED_DIR = EMBEDDINGS_DIR / "bundled"
 
 EMBED_FILE_PATTERN = re.compile(r"^(?P<year>\d{4})-(?P<month>\d{1,2})-meeting-embed\.json$")
 BUNDLE_FILE_PATTERN = re.compile(r"^bundle-(\d+)\.json$")
+BUNDLE_META_PATTERN = re.compile(r"^bundle-(\d+)-meta\.json$")
 
 
 def ensure_directories() -> None:
@@ -18,8 +33,11 @@ def ensure_directories() -> None:
 
 
 def next_bundle_index() -> int:
-    existing = [BUNDLE_FILE_PATTERN.match(path.name) for path in BUNDLED_DIR.glob("bundle-*.json")]
-    indices = [int(match.group(1)) for match in existing if match]
+    indices = []
+    for path in BUNDLED_DIR.glob("bundle-*.json"):
+        match = BUNDLE_FILE_PATTERN.match(path.name) or BUNDLE_META_PATTERN.match(path.name)
+        if match:
+            indices.append(int(match.group(1)))
     return max(indices, default=0) + 1
 
 
@@ -36,8 +54,11 @@ def load_embeddings() -> List[Dict[str, Any]]:
         year = int(match.group("year"))
         month = int(match.group("month"))
 
-        with path.open("r", encoding="utf-8") as file:
-            records = json.load(file)
+        if orjson is not None:
+            records = orjson.loads(path.read_bytes())
+        else:
+            with path.open("r", encoding="utf-8") as file:
+                records = json.load(file)
 
         for record in records:
             record["year"] = year
@@ -47,25 +68,65 @@ def load_embeddings() -> List[Dict[str, Any]]:
     return combined
 
 
-def write_bundle(records: List[Dict[str, Any]]) -> Path:
+def write_bundle(records: List[Dict[str, Any]], quantize: bool = False) -> Path:
+    """
+    Write embeddings as a single float16 .npy matrix plus a metadata JSON.
+
+    With quantize=True the matrix is stored as int8 with a per-row scale
+    folded in (cosine is scale-invariant per row, so readers only need the
+    int8 matrix) — half the float16 footprint, adequate for ranking.
+
+    Splitting the payload keeps the metadata file small and lets readers load
+    the matrix as one contiguous array instead of re-parsing per-row JSON
+    floats. Rows are L2-normalized at write time so query-time cosine
+    similarity is a plain dot product. Row order in the matrix matches
+    record order in the metadata.
+    """
     if not records:
         raise ValueError("No embeddings found to bundle.")
 
     bundle_idx = next_bundle_index()
-    output_path = BUNDLED_DIR / f"bundle-{bundle_idx}.json"
+    matrix_path = BUNDLED_DIR / f"bundle-{bundle_idx}.npy"
+    meta_path = BUNDLED_DIR / f"bundle-{bundle_idx}-meta.json"
 
-    with output_path.open("w", encoding="utf-8") as file:
-        json.dump(records, file, ensure_ascii=False, indent=2)
+    matrix = np.asarray([record.pop("embedding") for record in records], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    np.divide(matrix, norms, out=matrix, where=norms > 0)
 
-    return output_path
+    if quantize:
+        scales = np.abs(matrix).max(axis=1, keepdims=True) / 127.0
+        scales[scales == 0] = 1.0
+        np.save(matrix_path, np.round(matrix / scales).astype(np.int8))
+    else:
+        np.save(matrix_path, matrix.astype(np.float16))
 
+    if hnswlib is not None and not quantize:
+        index = hnswlib.Index(space="cosine", dim=matrix.shape[1])
+        index.init_index(max_elements=matrix.shape[0], ef_construction=200, M=16)
+        index.add_items(matrix, np.arange(matrix.shape[0]))
+        index.save_index(str(matrix_path.with_suffix(".hnsw")))
 
-def main() -> Path:
+    if orjson is not None:
+        meta_path.write_bytes(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+    else:
+        with meta_path.open("w", encoding="utf-8") as file:
+            json.dump(records, file, ensure_ascii=False, indent=2)
+
+    return matrix_path
+
+
+def main(quantize: bool = False) -> Path:
     ensure_directories()
     records = load_embeddings()
-    return write_bundle(records)
+    return write_bundle(records, quantize=quantize)
 
 
 if __name__ == "__main__":
-    bundle_path = main()
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Bundle per-month embedding files into a single corpus.")
+    parser.add_argument("--int8", action="store_true", help="Quantize embeddings to int8 (half the float16 footprint).")
+    args = parser.parse_args()
+
+    bundle_path = main(quantize=args.int8)
     print(f"Bundled embeddings written to {bundle_path}")
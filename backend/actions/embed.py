@@ -1,13 +1,15 @@
 from argparse import ArgumentParser
 from os import getenv
-from os.path import join, dirname
+from os.path import join
 
-from dotenv import load_dotenv
 from openai import OpenAI
 from pandas import read_json, DataFrame
 
+# Load environment variables before reading OPENAI_API_KEY below
+import _env  # noqa: F401
+
+from clients.embedding_cache import _cache_key, get_cached_embedding, store_embedding
 
-load_dotenv(join(dirname(dirname(__file__)), ".env"))
 
 OPENAI_API_KEY = getenv("OPENAI_API_KEY")
 
@@ -15,9 +17,44 @@ client = OpenAI(api_key=OPENAI_API_KEY)
 
 
 
+# Maximum number of inputs the OpenAI embeddings endpoint accepts per request
+EMBED_BATCH_SIZE = 2048
+
+
 def get_embedding(text):
+    cached = get_cached_embedding(text)
+    if cached is not None:
+        return cached
+
     resp = client.embeddings.create(model="text-embedding-3-small", input=text)
-    return resp.data[0].embedding
+    embedding = resp.data[0].embedding
+    store_embedding(text, embedding)
+    return embedding
+
+def get_embeddings(texts):
+    """Embed many texts at once, batching up to 2048 inputs per API call."""
+    embeddings = [get_cached_embedding(text) for text in texts]
+
+    # Embed each distinct text once and fan the result back to every position
+    pending = {}
+    for i, embedding in enumerate(embeddings):
+        if embedding is None:
+            pending.setdefault(_cache_key(texts[i]), []).append(i)
+
+    unique = [positions[0] for positions in pending.values()]
+
+    for start in range(0, len(unique), EMBED_BATCH_SIZE):
+        batch = unique[start:start + EMBED_BATCH_SIZE]
+        resp = client.embeddings.create(
+            model="text-embedding-3-small",
+            input=[texts[i] for i in batch]
+        )
+        for i, item in zip(batch, resp.data):
+            store_embedding(texts[i], item.embedding)
+            for position in pending[_cache_key(texts[i])]:
+                embeddings[position] = item.embedding
+
+    return embeddings
 
 def main(month: int, year: int, file_name: str, point_summary: bool = False):
     meeting_notes = read_json(file_name)
@@ -26,25 +63,24 @@ def main(month: int, year: int, file_name: str, point_summary: bool = False):
 
         if point_summary:
             for point in row['points']:
-                embedding = get_embedding(point)
-
                 output.append({
                     'year': year,
                     'month': month,
                     'slide': row['slide'],
-                    'text': point,
-                    'embedding': embedding
+                    'text': point
                 })
         else:
-            embedding = get_embedding(row['text'])
             output.append({
                 'year': year,
                 'month': month,
                 'slide': row['slide'] if 'slide' in row else row['page'],
-                'text': row['text'],
-                'embedding': embedding
+                'text': row['text']
             })
 
+    embeddings = get_embeddings([record['text'] for record in output])
+    for record, embedding in zip(output, embeddings):
+        record['embedding'] = embedding
+
     return output
 
 # Main execution
@@ -8,37 +8,54 @@ Usage (Python):
     from backend.actions.process_slides import SlideProcessor
 
     processor = SlideProcessor()
-    async for chunk in processor.stream_from_bytes(pdf_bytes, "slides.pdf", "Nov 2024 Meetup"):
+    async for chunk in processor.stream_from_path("slides.pdf", "slides.pdf", "Nov 2024 Meetup"):
         print(chunk)
 """
 
 import argparse
 import asyncio
 import base64
+import hashlib
 import json
 import os
 import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from os.path import join, dirname
 from typing import AsyncGenerator
 
+import tempfile
+
 import fitz  # PyMuPDF - used only for PDF to image conversion
-from dotenv import load_dotenv
 from openai import AsyncOpenAI
 
-# Load environment variables (for CLI usage)
-load_dotenv(join(dirname(dirname(dirname(__file__))), ".env"))
+try:
+    # Optional: C-accelerated JSON for the large embedding payloads
+    import orjson
+except ImportError:
+    orjson = None
+
+# Load environment variables before the clients read them (for CLI usage)
+import _env  # noqa: F401
 
-from clients import get_embedding
+from clients import get_embedding, get_openai, openai_rate_limit
 
 EMBEDDINGS_DIR = "embeddings"
 
+# Cached vision analyses, keyed by slide image + prompt + model hash
+VISION_CACHE_DIR = os.path.join(EMBEDDINGS_DIR, ".vision_cache")
+
 # OpenAI model for vision analysis
 VISION_MODEL = "gpt-4.1"
 
 # DPI for rendering PDF pages as images (higher = better quality but larger)
 RENDER_DPI = 150
 
+# Maximum number of pages processed concurrently (vision + embedding calls)
+PAGE_CONCURRENCY = int(os.getenv("SLIDE_CONCURRENCY", "8"))
+
+# JPEG quality for rendered pages; ~3-5x smaller than PNG at slide quality
+JPEG_QUALITY = 85
+
 # The prompt for slide analysis via vision
 VISION_PROMPT = """Analyze this slide image and extract the key information.
 
@@ -58,65 +75,159 @@ Do not hallucinate or make up information. Do not include any information that i
 Ensure the JSON is valid and well-formed.
 """
 
+# Schema enforced on vision responses so output is guaranteed-parseable JSON
+SLIDE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "slide_title": {"type": "string"},
+        "key_points": {"type": "array", "items": {"type": "string"}},
+    },
+    "required": ["slide_title", "key_points"],
+    "additionalProperties": False,
+}
+
+def _dump_jsonl_line(chunk: dict) -> bytes:
+    """Serialize one chunk as a JSONL line, via orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(chunk) + b"\n"
+    return json.dumps(chunk, ensure_ascii=False).encode("utf-8") + b"\n"
+
+
+def _read_done_pages(path: str) -> set[int]:
+    """Read page numbers already present in a JSONL output (for --resume)."""
+    done = set()
+    try:
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    done.add(json.loads(line)["page_num"])
+    except (OSError, json.JSONDecodeError, KeyError):
+        pass
+    return done
+
+
+# Shared process pool for page rasterization (lazy initialized)
+_render_pool: ProcessPoolExecutor | None = None
+
+
+def _get_render_pool() -> ProcessPoolExecutor:
+    """Get or create the shared rendering process pool."""
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _render_pool
+
+
+# One parsed Document cached per worker process, keyed by PDF path.
+# PyMuPDF is not thread/process-shareable, so each worker keeps its own;
+# passing a path instead of bytes keeps the whole PDF out of the pickled
+# task arguments (one disk read per worker instead of one copy per page).
+_worker_doc: tuple[str, "fitz.Document"] | None = None
+
+
+def _render_page_worker(pdf_path: str, page_index: int, dpi: int) -> bytes:
+    """Render one PDF page to JPEG bytes (runs in a worker process)."""
+    global _worker_doc
+
+    if _worker_doc is None or _worker_doc[0] != pdf_path:
+        if _worker_doc is not None:
+            _worker_doc[1].close()
+        _worker_doc = (pdf_path, fitz.open(pdf_path))
+
+    # load_page + explicit release keeps only one page resident per worker,
+    # while the parsed document itself is reused across pages
+    page = _worker_doc[1].load_page(page_index)
+    try:
+        return page.get_pixmap(dpi=dpi).tobytes("jpeg", jpg_quality=JPEG_QUALITY)
+    finally:
+        page = None
+
 
 class SlideProcessor:
     """Process PDF slides using GPT-4o Vision and create embeddings for RAG."""
 
-    def __init__(self, dpi: int = RENDER_DPI):
+    def __init__(self, dpi: int = RENDER_DPI, concurrency: int = PAGE_CONCURRENCY):
         """
         Initialize the processor.
 
         Args:
             dpi: Resolution for rendering PDF pages (default: 150)
+            concurrency: Max pages processed concurrently (default: 8)
         """
-        self._openai_client: AsyncOpenAI | None = None
         self.dpi = dpi
+        self.concurrency = concurrency
 
     def _get_openai(self) -> AsyncOpenAI:
-        """Get or create async OpenAI client."""
-        if self._openai_client is None:
-            from os import getenv
-            self._openai_client = AsyncOpenAI(api_key=getenv("OPENAI_API_KEY"))
-        return self._openai_client
-
-    def _render_page_to_base64(self, page: fitz.Page) -> str:
-        """Render a PDF page to a base64-encoded PNG image."""
-        pix = page.get_pixmap(dpi=self.dpi)
-        png_bytes = pix.tobytes("png")
-        return base64.b64encode(png_bytes).decode("utf-8")
+        """Get the shared module-scope async OpenAI client."""
+        return get_openai()
+
+    async def _render_page_to_base64(self, pdf_path: str, page_index: int) -> str:
+        """Render a PDF page to a base64-encoded JPEG image off the event loop."""
+        loop = asyncio.get_running_loop()
+        jpeg_bytes = await loop.run_in_executor(
+            _get_render_pool(), _render_page_worker, pdf_path, page_index, self.dpi
+        )
+        return base64.b64encode(jpeg_bytes).decode("utf-8")
+
+    @staticmethod
+    def _vision_cache_path(base64_image: str) -> str:
+        """Cache file path for a slide image's vision analysis."""
+        key = hashlib.sha256(
+            base64_image.encode() + VISION_PROMPT.encode() + VISION_MODEL.encode()
+        ).hexdigest()
+        return os.path.join(VISION_CACHE_DIR, f"{key}.json")
 
     async def _analyze_slide_image(self, base64_image: str, page_num: int) -> dict | None:
         """Analyze slide image using GPT-4o Vision."""
+        # Reuse a cached analysis when the same slide was processed before
+        cache_path = self._vision_cache_path(base64_image)
+        if os.path.exists(cache_path):
+            try:
+                with open(cache_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError):
+                pass
+
         client = self._get_openai()
 
         try:
-            response = await client.responses.create(
-                model=VISION_MODEL,
-                input=[
-                    {
-                        "role": "user",
-                        "content": [
-                            {"type": "input_text", "text": VISION_PROMPT},
-                            {
-                                "type": "input_image",
-                                "image_url": f"data:image/png;base64,{base64_image}",
-                            },
-                        ],
-                    }
-                ],
-            )
-
-            # Parse the JSON response
-            response_text = response.output_text
-
-            # Try to extract JSON from the response
-            # Sometimes the model wraps it in markdown code blocks
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0]
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0]
-
-            return json.loads(response_text.strip())
+            async with openai_rate_limit():
+                response = await client.responses.create(
+                    model=VISION_MODEL,
+                    input=[
+                        {
+                            "role": "user",
+                            "content": [
+                                {"type": "input_text", "text": VISION_PROMPT},
+                                {
+                                    "type": "input_image",
+                                    "image_url": f"data:image/jpeg;base64,{base64_image}",
+                                },
+                            ],
+                        }
+                    ],
+                    text={
+                        "format": {
+                            "type": "json_schema",
+                            "name": "slide",
+                            "schema": SLIDE_SCHEMA,
+                            "strict": True,
+                        }
+                    },
+                )
+
+            # Structured output guarantees parseable JSON matching SLIDE_SCHEMA
+            analysis = json.loads(response.output_text)
+
+            # Persist for idempotent re-runs (write atomically via rename)
+            if analysis is not None:
+                os.makedirs(VISION_CACHE_DIR, exist_ok=True)
+                tmp_path = f"{cache_path}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(analysis, f, ensure_ascii=False)
+                os.replace(tmp_path, cache_path)
+
+            return analysis
 
         except json.JSONDecodeError as e:
             print(f"    Warning: Could not parse JSON for page {page_num}: {e}")
@@ -146,22 +257,65 @@ class SlideProcessor:
         """Get embedding for text using shared OpenAI client."""
         return await get_embedding(text)
 
-    async def stream_from_bytes(
+    async def _process_page(
         self,
-        pdf_bytes: bytes,
+        pdf_path: str,
+        page_num: int,
+        total_pages: int,
+        session_info: str,
+        semaphore: asyncio.Semaphore,
+    ) -> dict | None:
+        """Render, analyze and embed a single page; None if the page is empty."""
+        async with semaphore:
+            start_time = time.time()
+
+            # Rasterization happens in a worker process, so pages render in
+            # parallel across cores without blocking the event loop.
+            base64_image = await self._render_page_to_base64(pdf_path, page_num - 1)
+
+            # Analyze with vision
+            analysis = await self._analyze_slide_image(base64_image, page_num)
+            text = self._extract_text_from_analysis(analysis)
+
+            # Skip if no content extracted
+            if not text.strip():
+                print(f"  Page {page_num}/{total_pages}: skipped (no content)")
+                return None
+
+            # Create embedding
+            embedding = await self._get_embedding(text)
+
+            elapsed = time.time() - start_time
+            print(f"  Page {page_num}/{total_pages}: done ({elapsed:.2f}s)")
+
+            return {
+                "session_info": session_info,
+                "text": text,
+                "timestamp": f"Slide {page_num}",
+                "embedding": embedding,
+                "page_num": page_num,
+                "total_pages": total_pages
+            }
+
+    async def stream_from_path(
+        self,
+        pdf_path: str,
         filename: str,
-        session_info: str
+        session_info: str,
+        skip_pages: set[int] | None = None
     ) -> AsyncGenerator[dict, None]:
         """
-        Process PDF from bytes using vision and yield each chunk as it's processed.
+        Process a PDF file using vision and yield each chunk as it's processed.
 
-        This is memory-efficient as it processes one page at a time
-        and allows the caller to save each chunk immediately.
+        This is memory-efficient: render workers open the file themselves,
+        so only the path crosses the process boundary and each chunk can be
+        saved by the caller as soon as it is ready.
 
         Args:
-            pdf_bytes: PDF file content as bytes
+            pdf_path: Path to the PDF file on disk
             filename: Name of the PDF file (for logging/metadata)
             session_info: Description of the session
+            skip_pages: Page numbers to skip (e.g. already processed on resume)
 
         Yields:
             dict: Embedded chunk for each slide with keys:
@@ -171,40 +325,54 @@ class SlideProcessor:
         """
         print(f"Processing: {filename}")
 
-        with fitz.open(stream=pdf_bytes, filetype="pdf") as doc:
+        with fitz.open(pdf_path) as doc:
             total_pages = len(doc)
-            print(f"Found {total_pages} pages")
-
-            for page_num, page in enumerate(doc, start=1):
-                start_time = time.time()
-                print(f"  Processing Page {page_num}/{total_pages}...", end=" ", flush=True)
-
-                # Render page to image
-                base64_image = self._render_page_to_base64(page)
-
-                # Analyze with vision
-                analysis = await self._analyze_slide_image(base64_image, page_num)
-                text = self._extract_text_from_analysis(analysis)
+        print(f"Found {total_pages} pages")
+
+        # Process up to self.concurrency pages at once; awaiting the tasks
+        # in page order keeps the yielded chunks deterministic.
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = [
+            asyncio.create_task(self._process_page(
+                pdf_path, page_num, total_pages, session_info, semaphore
+            ))
+            for page_num in range(1, total_pages + 1)
+            if not skip_pages or page_num not in skip_pages
+        ]
 
-                # Skip if no content extracted
-                if not text.strip():
-                    print("Skipped (no content)")
-                    continue
-
-                # Create embedding
-                embedding = await self._get_embedding(text)
+        try:
+            for task in tasks:
+                chunk = await task
+                if chunk is not None:
+                    yield chunk
+        finally:
+            for task in tasks:
+                task.cancel()
 
-                elapsed = time.time() - start_time
-                print(f"Done ({elapsed:.2f}s)")
+    async def stream_from_bytes(
+        self,
+        pdf_bytes: bytes,
+        filename: str,
+        session_info: str,
+        skip_pages: set[int] | None = None
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Process PDF from in-memory bytes; see stream_from_path.
 
-                yield {
-                    "session_info": session_info,
-                    "text": text,
-                    "timestamp": f"Slide {page_num}",
-                    "embedding": embedding,
-                    "page_num": page_num,
-                    "total_pages": total_pages
-                }
+        The bytes are spooled to a temporary file so render workers read
+        from disk instead of receiving a pickled copy per page.
+        """
+        tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+        try:
+            tmp.write(pdf_bytes)
+            tmp.close()
+            async for chunk in self.stream_from_path(
+                tmp.name, filename, session_info, skip_pages=skip_pages
+            ):
+                yield chunk
+        finally:
+            tmp.close()
+            os.unlink(tmp.name)
 
     async def process_from_bytes(
         self,
@@ -251,26 +419,34 @@ class SlideProcessor:
         if not pdf_path.exists():
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
 
-        # Read file bytes
-        with open(pdf_path, "rb") as f:
-            pdf_bytes = f.read()
-
-        embedded_chunks = await self.process_from_bytes(pdf_bytes, pdf_path.name, session_info)
-
-        # Save to embeddings directory (optional)
-        if save_local and embedded_chunks:
+        out = None
+        output_path = None
+        if save_local:
             if output_filename is None:
-                output_filename = f"slides-{pdf_path.stem}.json"
+                output_filename = f"slides-{pdf_path.stem}.jsonl"
 
-            if not output_filename.endswith(".json"):
-                output_filename += ".json"
+            if not output_filename.endswith((".json", ".jsonl")):
+                output_filename += ".jsonl"
 
             output_path = os.path.join(EMBEDDINGS_DIR, output_filename)
             os.makedirs(EMBEDDINGS_DIR, exist_ok=True)
+            # No resume support here, so truncate: re-running the same deck
+            # must not append a second copy of every chunk
+            out = open(output_path, "wb")
 
-            with open(output_path, "w", encoding="utf-8") as f:
-                json.dump(embedded_chunks, f, indent=2, ensure_ascii=False)
-
+        # Each chunk is appended to the JSONL stream as soon as it completes,
+        # so a partial run leaves a usable file for --resume
+        embedded_chunks = []
+        try:
+            async for chunk in self.stream_from_path(str(pdf_path), pdf_path.name, session_info):
+                if out is not None:
+                    out.write(_dump_jsonl_line(chunk))
+                embedded_chunks.append(chunk)
+        finally:
+            if out is not None:
+                out.close()
+
+        if output_path is not None:
             print(f"\nSaved to: {output_path}")
 
         print(f"Total slides processed: {len(embedded_chunks)}")
@@ -298,12 +474,17 @@ async def async_main():
         "--output",
         type=str,
         default=None,
-        help="Output filename (default: slides-{pdf_name}.json)"
+        help="Output filename (default: slides-{pdf_name}.jsonl)"
     )
     parser.add_argument(
         "--no-save",
         action="store_true",
-        help="Skip saving JSON file locally"
+        help="Skip saving JSONL file locally"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip pages already present in the output JSONL file"
     )
     parser.add_argument(
         "--dpi",
@@ -323,33 +504,41 @@ async def async_main():
         if args.output:
             output_filename = args.output
         else:
-            output_filename = f"slides-{pdf_path.stem}.json"
+            output_filename = f"slides-{pdf_path.stem}.jsonl"
 
-        if not output_filename.endswith(".json"):
-            output_filename += ".json"
+        if not output_filename.endswith((".json", ".jsonl")):
+            output_filename += ".jsonl"
 
         output_path = os.path.join(EMBEDDINGS_DIR, output_filename)
         os.makedirs(EMBEDDINGS_DIR, exist_ok=True)
 
-        # Read PDF bytes
-        with open(pdf_path, "rb") as f:
-            pdf_bytes = f.read()
+        # Resume: skip pages a previous run already wrote to the JSONL file
+        skip_pages = None
+        if args.resume and not args.no_save:
+            skip_pages = _read_done_pages(output_path)
+            if skip_pages:
+                print(f"Resuming: {len(skip_pages)} pages already done")
 
-        # Process and save incrementally
+        # Process, appending each chunk to the JSONL stream as it completes;
+        # peak memory stays at one chunk instead of the whole deck
         processor = SlideProcessor(dpi=args.dpi)
-        chunks = []
+        processed = 0
+        # Append only when resuming; otherwise truncate so a plain re-run
+        # replaces the file instead of duplicating every chunk
+        out = None if args.no_save else open(output_path, "ab" if args.resume else "wb")
 
-        async for chunk in processor.stream_from_bytes(pdf_bytes, pdf_path.name, args.session):
-            # Remove page_num and total_pages before saving
-            save_chunk = {k: v for k, v in chunk.items() if k not in ("page_num", "total_pages")}
-            chunks.append(save_chunk)
-
-            # Save after each slide if not disabled
-            if not args.no_save:
-                with open(output_path, "w", encoding="utf-8") as f:
-                    json.dump(chunks, f, indent=2, ensure_ascii=False)
-
-        print(f"\nTotal slides processed: {len(chunks)}")
+        try:
+            async for chunk in processor.stream_from_path(
+                str(pdf_path), pdf_path.name, args.session, skip_pages=skip_pages
+            ):
+                if out is not None:
+                    out.write(_dump_jsonl_line(chunk))
+                processed += 1
+        finally:
+            if out is not None:
+                out.close()
+
+        print(f"\nTotal slides processed: {processed}")
         if not args.no_save:
             print(f"Saved to: {output_path}")
 
@@ -16,21 +16,70 @@ Usage (Python):
 
 import argparse
 import asyncio
+import bisect
+import io
 import json
 import os
 import re
-from os.path import join, dirname
+from concurrent.futures import ProcessPoolExecutor
 
-from dotenv import load_dotenv
 from youtube_transcript_api import YouTubeTranscriptApi
 
-# Load environment variables (for CLI usage)
-load_dotenv(join(dirname(dirname(dirname(__file__))), ".env"))
+try:
+    # Optional: C-accelerated JSON for the large embedding payloads
+    import orjson
+except ImportError:
+    orjson = None
 
-from clients import get_embedding
+# Load environment variables before the clients read them (for CLI usage)
+import _env  # noqa: F401
+
+from clients import get_embedding, get_embeddings
 
 EMBEDDINGS_DIR = "embeddings"
 
+# Sentence splitter: non-terminator runs ending in .!? (or end of input)
+SENTENCE_PATTERN = re.compile(r'\s*([^.!?]+(?:[.!?]+|$))')
+
+# URL shapes that carry an 11-character video ID, folded into one
+# alternation and compiled once at import
+VIDEO_ID_PATTERN = re.compile(r'(?:v=|youtu\.be/|embed/|shorts/)([0-9A-Za-z_-]{11})')
+BARE_VIDEO_ID_PATTERN = re.compile(r'^[0-9A-Za-z_-]{11}$')
+
+
+# Shared process pool for transcript fetch + chunking (lazy initialized).
+# The fetch is blocking and the splitting is pure-Python CPU work, so both
+# run off the event loop; embedding stays async in the main process.
+_chunk_pool: ProcessPoolExecutor | None = None
+
+
+def _get_chunk_pool() -> ProcessPoolExecutor:
+    """Get or create the shared chunking process pool."""
+    global _chunk_pool
+    if _chunk_pool is None:
+        _chunk_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+    return _chunk_pool
+
+
+def _prepare_chunks_worker(
+    video_id: str, language: str, chunk_size: int, overlap: int
+) -> list[tuple[str, int]]:
+    """Fetch and chunk a transcript (runs in a worker process)."""
+    transcriber = YouTubeTranscriber(
+        chunk_size=chunk_size, overlap=overlap, language=language
+    )
+    return transcriber._prepare_chunks(video_id)
+
+
+def _write_chunks_json(path: str, chunks: list[dict]) -> None:
+    """Write embedded chunks as compact JSON, via orjson when available."""
+    if orjson is not None:
+        with open(path, "wb") as f:
+            f.write(orjson.dumps(chunks))
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(chunks, f, ensure_ascii=False)
+
 
 class YouTubeTranscriber:
     """Transcribe YouTube videos and create embeddings for RAG."""
@@ -53,18 +102,11 @@ class YouTubeTranscriber:
     @staticmethod
     def extract_video_id(url: str) -> str | None:
         """Extract the video ID from a YouTube URL."""
-        patterns = [
-            r'(?:v=)([0-9A-Za-z_-]{11})',
-            r'(?:youtu\.be/)([0-9A-Za-z_-]{11})',
-            r'(?:embed/)([0-9A-Za-z_-]{11})',
-            r'(?:shorts/)([0-9A-Za-z_-]{11})',
-        ]
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                return match.group(1)
+        match = VIDEO_ID_PATTERN.search(url)
+        if match:
+            return match.group(1)
 
-        if re.match(r'^[0-9A-Za-z_-]{11}$', url):
+        if BARE_VIDEO_ID_PATTERN.match(url):
             return url
 
         return None
@@ -74,128 +116,143 @@ class YouTubeTranscriber:
         transcript = self._api.fetch(video_id, languages=[self.language])
         return transcript.to_raw_data()
 
-    def _build_char_to_time_map(self, transcript: list[dict]) -> tuple[str, list[tuple[int, float]]]:
-        """Build full text and mapping from character positions to timestamps."""
-        char_to_time = []
-        full_text_parts = []
-        char_position = 0
+    def _build_char_to_time_map(self, transcript: list[dict]) -> tuple[str, list[int], list[float]]:
+        """Build full text and parallel position/timestamp arrays for lookups."""
+        positions = []
+        times = []
 
+        # Write into one buffer and record positions via tell(), so offsets
+        # stay exactly consistent with the final string by construction
+        buffer = io.StringIO()
         for entry in transcript:
-            char_to_time.append((char_position, entry['start']))
-            full_text_parts.append(entry['text'])
-            char_position += len(entry['text']) + 1
-
-        return " ".join(full_text_parts), char_to_time
-
-    def _get_time_for_char_position(self, char_pos: int, char_to_time: list[tuple[int, float]]) -> float:
-        """Find the timestamp for a given character position."""
-        result_time = char_to_time[0][1] if char_to_time else 0.0
-        for pos, time in char_to_time:
-            if pos <= char_pos:
-                result_time = time
-            else:
-                break
-        return result_time
+            positions.append(buffer.tell())
+            times.append(entry['start'])
+            buffer.write(entry['text'])
+            buffer.write(' ')
+
+        return buffer.getvalue(), positions, times
+
+    def _get_time_for_char_position(self, char_pos: int, positions: list[int], times: list[float]) -> float:
+        """Find the timestamp for a given character position via binary search."""
+        if not positions:
+            return 0.0
+        i = bisect.bisect_right(positions, char_pos) - 1
+        return times[max(i, 0)]
 
     @staticmethod
     def _split_into_sentences(text: str) -> list[str]:
         """Split text into sentences."""
-        pattern = r'(?<=[.!?])\s+'
-        sentences = re.split(pattern, text)
-        return [s.strip() for s in sentences if s.strip()]
+        return [
+            sentence
+            for match in SENTENCE_PATTERN.finditer(text)
+            if (sentence := match.group(1).strip())
+        ]
 
     async def _get_embedding(self, text: str) -> list[float]:
         """Get embedding for text using shared OpenAI client."""
         return await get_embedding(text)
 
-    async def transcribe(
-        self,
-        url: str,
-        session_info: str,
-        output_filename: str = None,
-        save_local: bool = True
-    ) -> list[dict]:
-        """
-        Transcribe YouTube video and create embeddings directly.
-
-        Args:
-            url: YouTube video URL or video ID
-            session_info: Description of the session
-            output_filename: Optional custom output filename
-            save_local: Whether to save JSON file locally (default: True)
-
-        Returns:
-            List of embedded chunks
-        """
-        video_id = self.extract_video_id(url)
-        if not video_id:
-            raise ValueError(f"Could not extract video ID from: {url}")
-
+    def _prepare_chunks(self, video_id: str) -> list[tuple[str, int]]:
+        """Fetch the transcript and chunk it; returns (text, start_seconds) pairs."""
         print(f"Fetching transcript for: {video_id}")
         transcript = self._fetch_transcript(video_id)
-        full_text, char_to_time = self._build_char_to_time_map(transcript)
+        full_text, positions, times = self._build_char_to_time_map(transcript)
         sentences = self._split_into_sentences(full_text)
 
         print(f"Processing {len(sentences)} sentences into chunks...")
 
-        # Process chunks and embed directly
-        embedded_chunks = []
+        # Sentence lengths are measured once up front instead of re-measuring
+        # on every overlap carry-over.
+        sentence_lengths = [len(sentence) for sentence in sentences]
+
+        pending_chunks = []
         current_chunk = []
+        current_lengths = []
         current_length = 0
-        chunk_index = 0
         char_position = 0
         chunk_start_char = 0
 
-        for sentence in sentences:
-            sentence_length = len(sentence)
-
-            # If chunk is full, embed and save it
+        for sentence, sentence_length in zip(sentences, sentence_lengths):
+            # If chunk is full, queue it for embedding
             if current_length + sentence_length > self.chunk_size and current_chunk:
                 chunk_text = " ".join(current_chunk)
-                start_time = self._get_time_for_char_position(chunk_start_char, char_to_time)
-                start_seconds = int(start_time)
-
-                print(f"  Embedding chunk {chunk_index + 1}...", end=" ", flush=True)
-                embedding = await self._get_embedding(chunk_text)
-
-                embedded_chunks.append({
-                    "session_info": session_info,
-                    "text": chunk_text,
-                    "timestamp": f"https://www.youtube.com/watch?v={video_id}&t={start_seconds}s",
-                    "embedding": embedding
-                })
-                print("Done")
-
-                chunk_index += 1
+                start_time = self._get_time_for_char_position(chunk_start_char, positions, times)
+                pending_chunks.append((chunk_text, int(start_time)))
 
                 # Overlap: keep last N sentences
-                overlap_sentences = current_chunk[-self.overlap:] if len(current_chunk) >= self.overlap else current_chunk
-                overlap_length = sum(len(s) + 1 for s in overlap_sentences)
+                if len(current_chunk) >= self.overlap:
+                    overlap_sentences = current_chunk[-self.overlap:]
+                    overlap_lengths = current_lengths[-self.overlap:]
+                else:
+                    overlap_sentences = current_chunk
+                    overlap_lengths = current_lengths
+                overlap_length = sum(overlap_lengths) + len(overlap_lengths)
 
                 current_chunk = overlap_sentences.copy()
+                current_lengths = overlap_lengths.copy()
                 current_length = overlap_length
                 chunk_start_char = char_position - overlap_length
 
             current_chunk.append(sentence)
+            current_lengths.append(sentence_length)
             current_length += sentence_length + 1
             char_position += sentence_length + 1
 
         # Don't forget the last chunk
         if current_chunk:
             chunk_text = " ".join(current_chunk)
-            start_time = self._get_time_for_char_position(chunk_start_char, char_to_time)
-            start_seconds = int(start_time)
+            start_time = self._get_time_for_char_position(chunk_start_char, positions, times)
+            pending_chunks.append((chunk_text, int(start_time)))
+
+        return pending_chunks
+
+    async def transcribe(
+        self,
+        url: str,
+        session_info: str,
+        output_filename: str = None,
+        save_local: bool = True
+    ) -> list[dict]:
+        """
+        Transcribe YouTube video and create embeddings directly.
+
+        Args:
+            url: YouTube video URL or video ID
+            session_info: Description of the session
+            output_filename: Optional custom output filename
+            save_local: Whether to save JSON file locally (default: True)
+
+        Returns:
+            List of embedded chunks
+        """
+        video_id = self.extract_video_id(url)
+        if not video_id:
+            raise ValueError(f"Could not extract video ID from: {url}")
+
+        # Fetch and chunk in a worker process: the transcript API call is
+        # blocking and the splitting is pure-Python CPU work, so the event
+        # loop stays free for status polling and other requests
+        loop = asyncio.get_running_loop()
+        pending_chunks = await loop.run_in_executor(
+            _get_chunk_pool(),
+            _prepare_chunks_worker,
+            video_id, self.language, self.chunk_size, self.overlap
+        )
 
-            print(f"  Embedding chunk {chunk_index + 1}...", end=" ", flush=True)
-            embedding = await self._get_embedding(chunk_text)
+        # One batched embeddings request instead of one round-trip per chunk
+        print(f"Embedding {len(pending_chunks)} chunks...", end=" ", flush=True)
+        embeddings = await get_embeddings([text for text, _ in pending_chunks])
+        print("Done")
 
-            embedded_chunks.append({
+        embedded_chunks = [
+            {
                 "session_info": session_info,
                 "text": chunk_text,
                 "timestamp": f"https://www.youtube.com/watch?v={video_id}&t={start_seconds}s",
                 "embedding": embedding
-            })
-            print("Done")
+            }
+            for (chunk_text, start_seconds), embedding in zip(pending_chunks, embeddings)
+        ]
 
         # Save to embeddings directory (optional)
         if save_local:
@@ -208,8 +265,7 @@ class YouTubeTranscriber:
             output_path = os.path.join(EMBEDDINGS_DIR, output_filename)
             os.makedirs(EMBEDDINGS_DIR, exist_ok=True)
 
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(embedded_chunks, f, indent=2, ensure_ascii=False)
+            _write_chunks_json(output_path, embedded_chunks)
 
             print(f"\nSaved to: {output_path}")
 
@@ -1,24 +1,57 @@
+import asyncio
 import logging
-from dotenv import load_dotenv
+from contextlib import asynccontextmanager
+from os import getenv
+
+# Load environment variables before anything that reads them at import time
+import _env  # noqa: F401
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from clients import get_embedding
+from clients.openai import close_openai
+from clients.postgres import close_postgres
+from clients.supabase import get_supabase, is_configured as supabase_configured
 from routes import ask_router, upload_router, feedback_router, realtime_router, voice_trace_router
 from services.langfuse_tracing import init_langfuse
 
-# Load environment variables
-load_dotenv()
-
-# Initialize Langfuse tracing (if enabled via LANGFUSE_ENABLED env var)
-init_langfuse()
-
 # Configure logging
 logging.basicConfig(level=logging.WARNING)
 
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the shared clients while the worker boots so the first request
+    # doesn't pay cold-start. Langfuse init (enabled via LANGFUSE_ENABLED)
+    # may do network I/O, so it runs in a thread off the event loop.
+    warmup = [asyncio.to_thread(init_langfuse)]
+    if supabase_configured():
+        warmup.append(get_supabase())
+    if getenv("OPENAI_API_KEY"):
+        warmup.append(get_embedding("warmup"))
+
+    for result in await asyncio.gather(*warmup, return_exceptions=True):
+        if isinstance(result, Exception):
+            logger.warning(f"Startup warmup step failed: {result}")
+
+    yield
+    # Drain the shared connection pools on shutdown
+    await close_openai()
+    await close_postgres()
+
+
 app = FastAPI(
     title="Carrie Backend API",
     description="RAG API for Birmingham AI community meeting notes",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    # orjson serializes response bodies several times faster than the
+    # stdlib encoder, which matters for large /search result payloads
+    default_response_class=ORJSONResponse,
 )
 
 # CORS middleware for frontend integration
@@ -49,5 +82,17 @@ async def root():
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+
+    # uvloop and httptools ship with uvicorn[standard]. Multi-worker is
+    # opt-in via WEB_CONCURRENCY: without REDIS_URL, job status and rate
+    # limits live per-process, so extra workers would break both
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
@@ -1,4 +1,11 @@
 from .supabase import get_supabase, check_supabase_configured
-from .openai import get_openai, get_embedding
+from .openai import get_openai, get_embedding, get_embeddings, openai_rate_limit
 
-__all__ = ["get_supabase", "check_supabase_configured", "get_openai", "get_embedding"]
+__all__ = [
+    "get_supabase",
+    "check_supabase_configured",
+    "get_openai",
+    "get_embedding",
+    "get_embeddings",
+    "openai_rate_limit",
+]
@@ -0,0 +1,60 @@
+"""
+Embedding cache: in-memory LRU over a persistent on-disk store.
+
+Keys are the SHA-256 of the normalized (stripped, lowercased) text, so
+near-duplicate inputs — repeated slide boilerplate, re-asked questions —
+share one vector. The LRU layer answers repeat lookups without touching
+disk; vectors are persisted as float32 .npy files under embeddings/.cache/
+so re-runs across processes skip the API round-trip too.
+"""
+
+from collections import OrderedDict
+from hashlib import sha256
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+CACHE_DIR = PROJECT_ROOT / "embeddings" / ".cache"
+
+# Entries kept in the in-memory LRU layer
+MEMORY_CACHE_SIZE = 4096
+
+_memory_cache: "OrderedDict[str, list[float]]" = OrderedDict()
+
+
+def _cache_key(text: str) -> str:
+    return sha256(text.strip().lower().encode("utf-8")).hexdigest()
+
+
+def _remember(key: str, embedding: list[float]) -> None:
+    _memory_cache[key] = embedding
+    _memory_cache.move_to_end(key)
+    while len(_memory_cache) > MEMORY_CACHE_SIZE:
+        _memory_cache.popitem(last=False)
+
+
+def get_cached_embedding(text: str) -> list[float] | None:
+    """Return the cached embedding for a text, or None on a cache miss."""
+    key = _cache_key(text)
+
+    cached = _memory_cache.get(key)
+    if cached is not None:
+        _memory_cache.move_to_end(key)
+        return cached
+
+    path = CACHE_DIR / f"{key}.npy"
+    if not path.exists():
+        return None
+
+    embedding = np.load(path).tolist()
+    _remember(key, embedding)
+    return embedding
+
+
+def store_embedding(text: str, embedding: list[float]) -> None:
+    """Persist an embedding to the on-disk cache and the in-memory layer."""
+    key = _cache_key(text)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    np.save(CACHE_DIR / f"{key}.npy", np.asarray(embedding, dtype=np.float32))
+    _remember(key, embedding)
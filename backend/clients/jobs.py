@@ -0,0 +1,116 @@
+"""
+Upload job status store.
+
+Job records live in Redis (JSON values with a 24h TTL) when REDIS_URL is
+set, so status survives restarts and is visible from every instance.
+Without Redis, or when it is unreachable, records fall back to a bounded
+in-memory LRU so a single instance still works and memory cannot grow
+without limit.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from .redis import get_redis, is_configured as redis_configured
+
+logger = logging.getLogger(__name__)
+
+# Seconds a job record stays readable after its last update
+JOB_TTL_SECONDS = 86400
+
+# Maximum jobs kept in the in-memory fallback
+MEMORY_JOBS_CAP = 1000
+
+# Minimum seconds between Redis writes for a job's progress updates;
+# terminal states always flush immediately
+FLUSH_INTERVAL = 0.5
+
+# States after which a job no longer changes
+TERMINAL_STATES = ("completed", "failed")
+
+# In-memory LRU fallback (most recently updated last)
+_memory_jobs: "OrderedDict[str, Dict]" = OrderedDict()
+
+# Last Redis write per job, for coalescing progress updates
+_last_write: Dict[str, float] = {}
+
+# Per-job change signals for same-process status streams; subscribers in
+# other workers fall back to their wait timeout and re-read Redis
+_events: Dict[str, asyncio.Event] = {}
+
+
+def _remember(job_id: str, data: Dict) -> None:
+    _memory_jobs[job_id] = data
+    _memory_jobs.move_to_end(job_id)
+    while len(_memory_jobs) > MEMORY_JOBS_CAP:
+        evicted, _ = _memory_jobs.popitem(last=False)
+        _last_write.pop(evicted, None)
+        _events.pop(evicted, None)
+
+
+def _notify(job_id: str) -> None:
+    event = _events.get(job_id)
+    if event is not None:
+        event.set()
+
+
+async def wait_for_update(job_id: str, timeout: float) -> None:
+    """Wait until the job changes in this process, or the timeout passes."""
+    event = _events.setdefault(job_id, asyncio.Event())
+    try:
+        await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    event.clear()
+
+
+async def set_job(job_id: str, data: Dict) -> None:
+    """Replace a job's status record."""
+    _remember(job_id, data)
+    _notify(job_id)
+    if not redis_configured():
+        return
+
+    # Coalesce hot progress updates: pollers tolerate half a second of
+    # staleness, so only creation, terminal states, and the first update
+    # after the interval pay a Redis round-trip
+    now = time.monotonic()
+    last = _last_write.get(job_id)
+    if (
+        data.get("status") not in TERMINAL_STATES
+        and last is not None
+        and now - last < FLUSH_INTERVAL
+    ):
+        return
+
+    _last_write[job_id] = now
+    try:
+        await get_redis().set(f"job:{job_id}", json.dumps(data), ex=JOB_TTL_SECONDS)
+    except Exception as e:
+        logger.warning(f"Redis job write failed, keeping in-memory copy: {e}")
+
+
+async def update_job(job_id: str, **fields) -> None:
+    """Merge fields into a job's status record."""
+    # Writers run in the process that created the job, so the in-memory
+    # copy is current and the merge needs no Redis read
+    job = _memory_jobs.get(job_id)
+    if job is None:
+        job = await get_job(job_id) or {}
+    await set_job(job_id, {**job, **fields})
+
+
+async def get_job(job_id: str) -> Optional[Dict]:
+    """Fetch a job's status record, or None if unknown."""
+    if redis_configured():
+        try:
+            raw = await get_redis().get(f"job:{job_id}")
+            if raw is not None:
+                return json.loads(raw)
+        except Exception as e:
+            logger.warning(f"Redis job read failed, using in-memory copy: {e}")
+    return _memory_jobs.get(job_id)
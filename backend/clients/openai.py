@@ -1,22 +1,164 @@
+import asyncio
+from contextlib import asynccontextmanager
 from os import getenv
+
+import httpx
 from openai import AsyncOpenAI
 
+try:
+    # Optional: client-side request pacing to stay under the account RPM cap
+    from aiolimiter import AsyncLimiter
+except ImportError:
+    AsyncLimiter = None
+
+from .embedding_cache import _cache_key, get_cached_embedding, store_embedding
+
 OPENAI_API_KEY = getenv("OPENAI_API_KEY")
 
-# Shared async OpenAI client (lazy initialized)
+# Maximum number of inputs the OpenAI embeddings endpoint accepts per request
+EMBED_BATCH_SIZE = 2048
+
+# Requests per minute allowed across all concurrent OpenAI calls
+OPENAI_RPM = int(getenv("OPENAI_RPM", "500"))
+
+# Retries for 429/5xx; the SDK backs off exponentially with jitter and
+# honors Retry-After headers, so bursty fan-out degrades instead of failing
+OPENAI_MAX_RETRIES = 6
+
+# Seconds to wait for more single-text callers before dispatching a batch
+MICRO_BATCH_WINDOW = 0.005
+
+# Shared async OpenAI client and rate limiter (lazy initialized)
 _openai_client: AsyncOpenAI | None = None
+_rate_limiter: "AsyncLimiter | None" = None
+
+# Micro-batching state: concurrent get_embedding callers enqueue
+# (text, future) pairs and a worker coalesces them into one API call
+_batch_queue: "asyncio.Queue[tuple[str, asyncio.Future]] | None" = None
+_batch_worker: asyncio.Task | None = None
+_dispatch_tasks: set[asyncio.Task] = set()
 
 
 def get_openai() -> AsyncOpenAI:
     """Get or create async OpenAI client"""
     global _openai_client
     if _openai_client is None:
-        _openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+        # Tuned pool: the default 10-keepalive limit throttles concurrent
+        # pipelines, and HTTP/2 multiplexes requests over one connection
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            http2=True,
+        )
+        _openai_client = AsyncOpenAI(
+            api_key=OPENAI_API_KEY,
+            http_client=http_client,
+            max_retries=OPENAI_MAX_RETRIES,
+        )
     return _openai_client
 
 
+async def close_openai() -> None:
+    """Close the shared client and its connection pool (app shutdown)."""
+    global _openai_client, _batch_worker
+    if _batch_worker is not None:
+        _batch_worker.cancel()
+        _batch_worker = None
+    if _openai_client is not None:
+        await _openai_client.close()
+        _openai_client = None
+
+
+async def _dispatch_embedding_batch(waiting: list[tuple[str, asyncio.Future]]) -> None:
+    """Embed one coalesced batch and resolve each caller's future."""
+    try:
+        client = get_openai()
+        async with openai_rate_limit():
+            resp = await client.embeddings.create(
+                model="text-embedding-3-small",
+                input=[text for text, _ in waiting]
+            )
+        for (text, future), item in zip(waiting, resp.data):
+            store_embedding(text, item.embedding)
+            if not future.done():
+                future.set_result(item.embedding)
+    except Exception as e:
+        for _, future in waiting:
+            if not future.done():
+                future.set_exception(e)
+
+
+async def _embedding_batch_worker() -> None:
+    """Coalesce concurrent get_embedding callers into batched API calls."""
+    while True:
+        waiting = [await _batch_queue.get()]
+
+        # Give other callers already on the loop a short window to join,
+        # then drain whatever arrived and dispatch without blocking the
+        # next batch on this one's round-trip
+        await asyncio.sleep(MICRO_BATCH_WINDOW)
+        while not _batch_queue.empty() and len(waiting) < EMBED_BATCH_SIZE:
+            waiting.append(_batch_queue.get_nowait())
+
+        task = asyncio.create_task(_dispatch_embedding_batch(waiting))
+        _dispatch_tasks.add(task)
+        task.add_done_callback(_dispatch_tasks.discard)
+
+
+@asynccontextmanager
+async def openai_rate_limit():
+    """Pace concurrent OpenAI calls to OPENAI_RPM; no-op without aiolimiter."""
+    global _rate_limiter
+    if AsyncLimiter is None:
+        yield
+        return
+    if _rate_limiter is None:
+        _rate_limiter = AsyncLimiter(max_rate=OPENAI_RPM, time_period=60)
+    async with _rate_limiter:
+        yield
+
+
 async def get_embedding(text: str) -> list[float]:
     """Get embedding for a text string using text-embedding-3-small"""
+    cached = get_cached_embedding(text)
+    if cached is not None:
+        return cached
+
+    global _batch_queue, _batch_worker
+    if _batch_queue is None:
+        _batch_queue = asyncio.Queue()
+    if _batch_worker is None or _batch_worker.done():
+        _batch_worker = asyncio.get_running_loop().create_task(_embedding_batch_worker())
+
+    future = asyncio.get_running_loop().create_future()
+    await _batch_queue.put((text, future))
+    return await future
+
+
+async def get_embeddings(texts: list[str]) -> list[list[float]]:
+    """Get embeddings for many texts, batching up to 2048 inputs per API call"""
+    embeddings: list[list[float] | None] = [get_cached_embedding(text) for text in texts]
+
+    # Embed each distinct text once and fan the result back to every
+    # position (decks repeat boilerplate slides, transcripts repeat lines)
+    pending: dict[str, list[int]] = {}
+    for i, embedding in enumerate(embeddings):
+        if embedding is None:
+            pending.setdefault(_cache_key(texts[i]), []).append(i)
+
+    unique = [positions[0] for positions in pending.values()]
+
     client = get_openai()
-    resp = await client.embeddings.create(model="text-embedding-3-small", input=text)
-    return resp.data[0].embedding
+    for start in range(0, len(unique), EMBED_BATCH_SIZE):
+        batch = unique[start:start + EMBED_BATCH_SIZE]
+        async with openai_rate_limit():
+            resp = await client.embeddings.create(
+                model="text-embedding-3-small",
+                input=[texts[i] for i in batch]
+            )
+        for i, item in zip(batch, resp.data):
+            store_embedding(texts[i], item.embedding)
+            for position in pending[_cache_key(texts[i])]:
+                embeddings[position] = item.embedding
+
+    return embeddings
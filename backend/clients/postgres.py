@@ -0,0 +1,63 @@
+"""
+Direct Postgres access for bulk ingest.
+
+PostgREST suits request-sized reads and writes, but bulk embedding
+inserts pay JSON parsing plus text-format vector parsing per row on the
+server. When DATABASE_URL (the Supabase Postgres connection string) is
+set, bulk writes go over a small asyncpg pool with the pgvector binary
+codecs registered, so COPY moves rows in binary and skips both costs.
+"""
+
+from os import getenv
+from typing import Sequence
+
+try:
+    import asyncpg
+    from pgvector.asyncpg import register_vector
+except ImportError:
+    asyncpg = None
+    register_vector = None
+
+DATABASE_URL = getenv("DATABASE_URL")
+
+# Shared connection pool (lazy initialized)
+_pool: "asyncpg.Pool | None" = None
+
+
+async def _init_connection(conn) -> None:
+    """Register the pgvector codecs so embeddings marshal as binary."""
+    await register_vector(conn)
+
+
+async def get_pool() -> "asyncpg.Pool":
+    """Get or create the shared asyncpg pool."""
+    global _pool
+    if _pool is None:
+        _pool = await asyncpg.create_pool(
+            DATABASE_URL, min_size=1, max_size=4, init=_init_connection
+        )
+    return _pool
+
+
+async def close_postgres() -> None:
+    """Close the shared pool (called on app shutdown)."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+
+
+def is_configured() -> bool:
+    """Check if direct Postgres access is available."""
+    return bool(DATABASE_URL and asyncpg is not None)
+
+
+async def copy_embeddings(records: Sequence[tuple]) -> None:
+    """COPY (source_id, text, timestamp, embedding) rows into embeddings."""
+    pool = await get_pool()
+    async with pool.acquire() as conn:
+        await conn.copy_records_to_table(
+            "embeddings",
+            records=records,
+            columns=["source_id", "text", "timestamp", "embedding"],
+        )
@@ -0,0 +1,25 @@
+from os import getenv
+
+try:
+    # Optional: shared state across instances (rate limits, etc.)
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+REDIS_URL = getenv("REDIS_URL")
+
+# Async Redis client (lazy initialized)
+_redis_client = None
+
+
+def is_configured() -> bool:
+    """Check if Redis is available and configured"""
+    return bool(REDIS_URL and aioredis is not None)
+
+
+def get_redis():
+    """Get or create async Redis client"""
+    global _redis_client
+    if _redis_client is None:
+        _redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+    return _redis_client
@@ -1,6 +1,9 @@
 from os import getenv
+
+import httpx
 from fastapi import HTTPException
 from supabase._async.client import create_client as create_async_client, AsyncClient
+from supabase.lib.client_options import AsyncClientOptions
 
 SUPABASE_URL = getenv("SUPABASE_URL")
 SUPABASE_KEY = getenv("SUPABASE_KEY")
@@ -13,13 +16,28 @@ async def get_supabase() -> AsyncClient:
     """Get or create async Supabase client"""
     global _supabase_client
     if _supabase_client is None:
-        _supabase_client = await create_async_client(SUPABASE_URL, SUPABASE_KEY)
+        # Same tuned pool shape as the OpenAI client: keepalive connections
+        # plus HTTP/2 multiplexing so gather-based bulk inserts actually
+        # run in parallel instead of serializing on TCP/TLS handshakes
+        options = AsyncClientOptions(
+            httpx_client=httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+                timeout=httpx.Timeout(30.0, connect=5.0),
+                http2=True,
+            )
+        )
+        _supabase_client = await create_async_client(SUPABASE_URL, SUPABASE_KEY, options=options)
     return _supabase_client
 
 
+def is_configured() -> bool:
+    """Check if Supabase credentials are configured"""
+    return bool(SUPABASE_URL and SUPABASE_KEY)
+
+
 def check_supabase_configured():
     """Raise HTTPException if Supabase is not configured"""
-    if not SUPABASE_URL or not SUPABASE_KEY:
+    if not is_configured():
         raise HTTPException(
             status_code=500,
             detail="Supabase credentials not configured"
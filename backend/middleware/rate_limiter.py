@@ -1,31 +1,51 @@
+import logging
+import math
 import time
-from collections import defaultdict
 from fastapi import Request, HTTPException
 
+from clients.redis import get_redis, is_configured as redis_configured
 from utils import get_client_ip
 
+logger = logging.getLogger(__name__)
+
+# Checks between sweeps of refilled per-IP buckets (bounds dict growth
+# from one-shot IPs)
+SWEEP_INTERVAL = 10_000
+
 
 class RateLimiter:
     """
-    In-memory sliding window rate limiter.
+    In-memory token-bucket rate limiter.
 
-    Note: With Cloud Run scaling, limits are per-instance, not global.
-    Each instance maintains its own request counts.
+    Each IP holds a bucket of `requests_per_minute` tokens refilled
+    continuously; a check costs two float ops and O(1) memory per IP
+    regardless of the configured rate.
+
+    When REDIS_URL is set, counting moves to Redis (fixed-window
+    INCR+EXPIRE, one round-trip per check) so the limit holds globally
+    across Cloud Run instances and uvicorn workers. Without Redis, or if
+    Redis is unreachable, checks fall back to the per-instance buckets.
     """
 
     def __init__(self, requests_per_minute: int = 15):
         self.requests_per_minute = requests_per_minute
         self.window_seconds = 60
-        self.requests: dict[str, list[float]] = defaultdict(list)
+        self.refill_rate = requests_per_minute / 60.0
+        # ip -> [tokens, last_refill]; a list so refills mutate in place
+        self.buckets: dict[str, list[float]] = {}
+        self._checks_until_sweep = SWEEP_INTERVAL
 
-    def _cleanup_old_requests(self, client_ip: str, current_time: float) -> None:
-        """Remove requests outside the sliding window."""
-        cutoff = current_time - self.window_seconds
-        self.requests[client_ip] = [
-            ts for ts in self.requests[client_ip] if ts > cutoff
+    def _sweep_full(self, current_time: float) -> None:
+        """Drop IPs whose buckets have refilled to capacity."""
+        full = [
+            ip for ip, (tokens, last_refill) in self.buckets.items()
+            if tokens + (current_time - last_refill) * self.refill_rate
+            >= self.requests_per_minute
         ]
+        for ip in full:
+            del self.buckets[ip]
 
-    def check_rate_limit(self, request: Request) -> None:
+    async def check_rate_limit(self, request: Request) -> None:
         """
         Check if request is within rate limit.
 
@@ -33,18 +53,67 @@ class RateLimiter:
             HTTPException: 429 if rate limit exceeded
         """
         client_ip = get_client_ip(request)
-        current_time = time.time()
 
-        self._cleanup_old_requests(client_ip, current_time)
+        if redis_configured():
+            try:
+                await self._check_redis(client_ip)
+                return
+            except HTTPException:
+                raise
+            except Exception as e:
+                logger.warning(f"Redis rate limit check failed, falling back to local buckets: {e}")
+
+        self._check_local(client_ip)
+
+    async def _check_redis(self, client_ip: str) -> None:
+        """Fixed-window count in Redis, shared across all instances."""
+        now = time.time()
+        key = f"rl:{client_ip}:{int(now // self.window_seconds)}"
+
+        # INCR + EXPIRE pipelined into one round-trip; the expiry outlives
+        # the window slightly so slow clocks never orphan keys
+        pipe = get_redis().pipeline()
+        pipe.incr(key)
+        pipe.expire(key, self.window_seconds + 10)
+        count, _ = await pipe.execute()
+
+        if count > self.requests_per_minute:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded. Maximum {self.requests_per_minute} requests per minute.",
+                headers={"Retry-After": str(self.window_seconds - int(now % self.window_seconds))}
+            )
+
+    def _check_local(self, client_ip: str) -> None:
+        """Token-bucket check against this instance's buckets."""
+        # Monotonic clock: wall-clock jumps must not refill or drain buckets
+        current_time = time.monotonic()
+
+        self._checks_until_sweep -= 1
+        if self._checks_until_sweep <= 0:
+            self._checks_until_sweep = SWEEP_INTERVAL
+            self._sweep_full(current_time)
+
+        bucket = self.buckets.get(client_ip)
+        if bucket is None:
+            self.buckets[client_ip] = [self.requests_per_minute - 1.0, current_time]
+            return
+
+        tokens = min(
+            float(self.requests_per_minute),
+            bucket[0] + (current_time - bucket[1]) * self.refill_rate,
+        )
+        bucket[1] = current_time
 
-        if len(self.requests[client_ip]) >= self.requests_per_minute:
+        if tokens < 1.0:
+            bucket[0] = tokens
             raise HTTPException(
                 status_code=429,
                 detail=f"Rate limit exceeded. Maximum {self.requests_per_minute} requests per minute.",
-                headers={"Retry-After": "60"}
+                headers={"Retry-After": str(math.ceil((1.0 - tokens) / self.refill_rate))}
             )
 
-        self.requests[client_ip].append(current_time)
+        bucket[0] = tokens - 1.0
 
 
 # Global rate limiter instance
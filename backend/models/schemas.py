@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from pydantic import BaseModel
 from typing import List, Dict, Optional
 
@@ -8,7 +9,11 @@ class QuestionRequest(BaseModel):
     enable_web_search: Optional[bool] = True
 
 
-class SearchResult(BaseModel):
+# Built internally from trusted RAGService rows, never parsed from HTTP
+# input, so a slotted dataclass avoids validation cost; Pydantic models
+# that embed it still validate it as a field type
+@dataclass(slots=True, frozen=True)
+class SearchResult:
     text: str
     timestamp: str
     session_info: str
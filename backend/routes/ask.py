@@ -1,19 +1,67 @@
+import asyncio
+import time
+
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import StreamingResponse
 
 from middleware import rate_limiter
-from models import QuestionRequest, SearchResult
+from models import QuestionRequest
+from services.lsh_cache import LSHCache
 from services.rag_service import RAGService
+from services.semantic_cache import SemanticCache
 from services.streaming_agent import StreamingMeetingNotesAgent
 from services.eventbrite_service import EventbriteService
+from clients import get_embedding
 from clients.eventbrite import is_configured as eventbrite_configured
 from utils import get_client_ip
 
 router = APIRouter(prefix="/v1", tags=["chat"])
 
-# Initialize RAG service (agent created per-request to allow web search toggle)
+# Initialize RAG service shared by all requests
 rag_service = RAGService()
 
+# Agent instances hold no per-request state (stream_answer works entirely
+# with locals), so one per web-search setting serves every request and the
+# prompt/tool construction cost is paid once at import
+agents = {
+    True: StreamingMeetingNotesAgent(rag_service, enable_web_search=True),
+    False: StreamingMeetingNotesAgent(rag_service, enable_web_search=False),
+}
+
+# Semantic answer caches, one per web-search setting since the toggle
+# changes what the agent may answer with
+answer_caches = {True: SemanticCache(), False: SemanticCache()}
+
+# Approximate cache for /search result sets, keyed by query embedding
+search_cache = LSHCache()
+
+# Coalesce token-level chunks into one SSE frame per size/time threshold;
+# each frame costs an ASGI send, so per-token frames dominate at high QPS
+SSE_FLUSH_BYTES = 512
+SSE_FLUSH_SECONDS = 0.05
+
+# Pre-encoded SSE framing; yielding bytes lets StreamingResponse skip its
+# per-frame str-to-bytes encode
+SSE_DATA = b"data: "
+SSE_END = b"\n\n"
+SSE_DONE = b"data: [DONE]\n\n"
+
+# Newlines would terminate an SSE data field early; translate() with a
+# precomputed table beats chained str.replace on the per-chunk hot path
+SSE_ESCAPE = str.maketrans({"\n": "\\n", "\r": "\\r"})
+
+# Comment frame emitted when the agent is quiet (e.g. mid tool call) so
+# proxies with 60s idle timeouts don't kill long-running streams
+SSE_PING_SECONDS = 15
+SSE_PING = b": ping\n\n"
+
+# X-Accel-Buffering tells nginx-style proxies not to buffer the stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
 
 @router.post("/chat")
 async def ask_question(request: Request, question_request: QuestionRequest):
@@ -31,43 +79,128 @@ async def ask_question(request: Request, question_request: QuestionRequest):
     Returns:
     Server-Sent Events stream with the answer
     """
-    rate_limiter.check_rate_limit(request)
+    await rate_limiter.check_rate_limit(request)
 
     try:
         # Get client IP for tracing (handles X-Forwarded-For for proxied requests)
         client_ip = get_client_ip(request)
 
-        # Create agent with requested configuration
-        agent = StreamingMeetingNotesAgent(
-            rag_service,
-            enable_web_search=question_request.enable_web_search
-        )
+        # The schema allows an explicit null (falsy, like the baseline
+        # treated it), so normalize before indexing the bool-keyed dicts
+        enable_web_search = bool(question_request.enable_web_search)
+
+        # Only first-turn questions are cacheable: follow-ups depend on the
+        # conversation history, which the cache key does not capture
+        cache = answer_caches[enable_web_search]
+        query_embedding = None
+        if not question_request.messages:
+            query_embedding = await get_embedding(question_request.question)
+            cached = await cache.get(query_embedding)
+            if cached is not None:
+                cached_answer, cached_trace_id = cached
+
+                async def replay():
+                    # Replay the original trace_id so the frontend can still
+                    # offer feedback; it lands on the trace that produced
+                    # this answer
+                    if cached_trace_id:
+                        yield b"event: trace_id\n" + SSE_DATA + cached_trace_id.encode("utf-8") + SSE_END
+                    escaped_answer = cached_answer.translate(SSE_ESCAPE)
+                    yield SSE_DATA + escaped_answer.encode("utf-8") + SSE_END
+                    yield SSE_DONE
+
+                return StreamingResponse(
+                    replay(),
+                    media_type="text/event-stream",
+                    headers=SSE_HEADERS,
+                )
+
+        # Pick the shared agent for the requested configuration
+        agent = agents[enable_web_search]
 
         async def generate():
-            # Stream the answer from the agent with conversation history
-            async for chunk_type, data in agent.stream_answer(
-                question_request.question,
-                question_request.messages,
-                user_id=client_ip
-            ):
-                if chunk_type == "trace_id":
-                    # Send trace ID as a special event
-                    yield f"event: trace_id\ndata: {data}\n\n"
-                else:
-                    # Send text chunk
-                    escaped_chunk = data.replace('\n', '\\n')
-                    yield f"data: {escaped_chunk}\n\n"
+            answer_parts = []
+            trace_id = None
+            buffer = []
+            buffered_len = 0
+            last_flush = time.monotonic()
+
+            def flush():
+                escaped_chunk = "".join(buffer).translate(SSE_ESCAPE)
+                buffer.clear()
+                return SSE_DATA + escaped_chunk.encode("utf-8") + SSE_END
+
+            # Pump agent events through a queue so the stream can emit
+            # keep-alive pings while a long tool call produces no tokens
+            events: asyncio.Queue = asyncio.Queue()
+
+            async def pump():
+                try:
+                    async for item in agent.stream_answer(
+                        question_request.question,
+                        question_request.messages,
+                        user_id=client_ip
+                    ):
+                        await events.put(item)
+                finally:
+                    await events.put(None)
+
+            pump_task = asyncio.create_task(pump())
+            try:
+                while True:
+                    try:
+                        item = await asyncio.wait_for(events.get(), timeout=SSE_PING_SECONDS)
+                    except asyncio.TimeoutError:
+                        if buffer:
+                            yield flush()
+                            buffered_len = 0
+                            last_flush = time.monotonic()
+                        else:
+                            yield SSE_PING
+                        continue
+                    if item is None:
+                        break
+                    chunk_type, data = item
+                    if chunk_type == "trace_id":
+                        # Send trace ID as a special event (flushing buffered
+                        # text first to keep frames in order)
+                        trace_id = data
+                        if buffer:
+                            yield flush()
+                            buffered_len = 0
+                        yield b"event: trace_id\n" + SSE_DATA + data.encode("utf-8") + SSE_END
+                    else:
+                        # Buffer text chunks into micro-batched frames
+                        answer_parts.append(data)
+                        buffer.append(data)
+                        buffered_len += len(data)
+                        now = time.monotonic()
+                        if buffered_len >= SSE_FLUSH_BYTES or now - last_flush >= SSE_FLUSH_SECONDS:
+                            yield flush()
+                            buffered_len = 0
+                            last_flush = now
+
+                # Surface any error the agent raised mid-stream
+                await pump_task
+            finally:
+                if not pump_task.done():
+                    pump_task.cancel()
+
+            if buffer:
+                yield flush()
 
             # Send completion marker
-            yield "data: [DONE]\n\n"
+            yield SSE_DONE
+
+            # Cache the full answer (and its trace_id, for feedback on
+            # replays) for near-duplicate questions
+            if query_embedding is not None:
+                await cache.put(query_embedding, ("".join(answer_parts), trace_id))
 
         return StreamingResponse(
             generate(),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-            }
+            headers=SSE_HEADERS,
         )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -88,11 +221,22 @@ async def search_notes(request: Request, question: str, top_k: int = 5, session_
     Returns:
     - List of search results with similarity scores
     """
-    rate_limiter.check_rate_limit(request)
+    await rate_limiter.check_rate_limit(request)
 
     try:
-        results = await rag_service.search_meeting_notes(question, top_k, session_filter)
-        return {"results": [SearchResult(**result) for result in results]}
+        # Near-duplicate queries short-circuit retrieval entirely; the
+        # embedding computed here is served back to the RAG service from
+        # the embedding cache on a miss, so it is not paid twice
+        query_embedding = await get_embedding(question)
+        scope = (top_k, session_filter)
+        results = search_cache.get(query_embedding, scope)
+        if results is None:
+            results = await rag_service.search_meeting_notes(question, top_k, session_filter)
+            search_cache.put(query_embedding, results, scope)
+        # The dicts come straight from RAGService already in SearchResult
+        # shape, so they go to the orjson serializer as-is instead of being
+        # re-wrapped in models on the output path
+        return {"results": results}
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
@@ -110,7 +254,7 @@ async def list_sessions(request: Request, filter: str = None):
     Returns:
     - List of sessions with session_info and chunk_count
     """
-    rate_limiter.check_rate_limit(request)
+    await rate_limiter.check_rate_limit(request)
 
     try:
         sessions = await rag_service.list_sessions(filter)
@@ -132,7 +276,7 @@ async def get_events(request: Request, action: str = "list", limit: int = 3, eve
     Returns:
     - List of events (action=list) or single event with full details (action=details)
     """
-    rate_limiter.check_rate_limit(request)
+    await rate_limiter.check_rate_limit(request)
 
     if not eventbrite_configured():
         raise HTTPException(status_code=503, detail="Eventbrite integration not configured")
@@ -40,7 +40,7 @@ async def create_realtime_session(request: Request):
     Returns:
         Ephemeral session credentials including client_secret
     """
-    rate_limiter.check_rate_limit(request)
+    await rate_limiter.check_rate_limit(request)
 
     if not OPENAI_API_KEY:
         raise HTTPException(status_code=500, detail="OpenAI API key not configured")
@@ -1,22 +1,26 @@
 """Upload routes module - handles YouTube and PDF uploads."""
+import hmac
 import os
-from typing import Dict
 
 from fastapi import APIRouter, Depends, Header, HTTPException
 
-# Shared in-memory job tracking (for simplicity; use Redis/DB for production)
-upload_jobs: Dict[str, Dict] = {}
+# Read once at import; the key doesn't change while the process runs.
+# Pre-encoded because compare_digest only accepts non-ASCII input as bytes.
+_EXPECTED_KEY = (os.getenv("UPLOAD_API_KEY") or "").encode("utf-8")
 
 
 def verify_api_key(x_api_key: str = Header(None)):
     """Verify the API key for protected endpoints."""
-    expected_key = os.getenv("UPLOAD_API_KEY")
-    if not expected_key:
+    if not _EXPECTED_KEY:
         raise HTTPException(
             status_code=500,
             detail="UPLOAD_API_KEY not configured on server"
         )
-    if not x_api_key or x_api_key != expected_key:
+    # compare_digest takes constant time, so the comparison doesn't leak
+    # how much of a guessed key matched
+    if not x_api_key or not hmac.compare_digest(
+        x_api_key.encode("utf-8"), _EXPECTED_KEY
+    ):
         raise HTTPException(
             status_code=401,
             detail="Invalid or missing API key"
@@ -1,5 +1,9 @@
 """PDF upload routes."""
 import asyncio
+import contextlib
+import os
+import tempfile
+import time
 import uuid
 import logging
 
@@ -7,86 +11,183 @@ from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
 
 from models import UploadResponse
 from clients import get_supabase, check_supabase_configured
+from clients.jobs import set_job, update_job
 from actions.process_slides import SlideProcessor
-from . import upload_jobs, verify_api_key
+from . import verify_api_key
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Producer/consumer tuning for the insert pipeline: chunks buffered between
+# the slide processor and Supabase, rows per insert, and how long a partial
+# batch may sit before it is flushed anyway
+QUEUE_MAXSIZE = 8
+INSERT_BATCH_SIZE = 16
+INSERT_FLUSH_SECONDS = 0.5
 
-async def process_pdf_upload(job_id: str, pdf_bytes: bytes, filename: str, session_info: str):
+# Bytes read from the upload stream at a time while spooling to disk
+UPLOAD_READ_BYTES = 1 << 20
+
+# Minimum seconds between per-slide progress message updates
+PROGRESS_INTERVAL = 0.5
+
+
+async def process_pdf_upload(job_id: str, pdf_path: str, filename: str, session_info: str):
     """Background task to process PDF slides and save to Supabase one page at a time."""
+    supabase = None
+    source_uuid = None
     try:
-        logger.info(f"[{job_id}] Starting PDF upload for file: {filename}")
+        logger.info("[%s] Starting PDF upload for file: %s", job_id, filename)
 
-        upload_jobs[job_id]["message"] = "Checking if PDF already exists..."
+        await update_job(job_id, message="Checking if PDF already exists...")
 
         # Connect to Supabase
         supabase = await get_supabase()
 
-        # Check if already processed (using filename as source_id)
-        existing = await supabase.table("sources").select("id").eq(
-            "source_type", "pdf"
-        ).eq("source_id", filename).execute()
+        # Claim the source row up front (filename as source_id): the
+        # UNIQUE(source_type, source_id) constraint makes this atomic, so
+        # one round trip replaces the duplicate-check SELECT and concurrent
+        # uploads of the same deck race cleanly
+        source_data = {
+            "source_type": "pdf",
+            "source_id": filename,
+            "session_info": session_info,
+            "chunk_count": 0
+        }
+        source_result = await supabase.table("sources").upsert(
+            source_data, on_conflict="source_type,source_id", ignore_duplicates=True
+        ).execute()
 
-        if existing.data:
-            logger.warning(f"[{job_id}] PDF {filename} already processed")
-            upload_jobs[job_id] = {
+        if not source_result.data:
+            logger.warning("[%s] PDF %s already processed", job_id, filename)
+            await set_job(job_id, {
                 "status": "failed",
                 "message": "PDF already processed",
                 "source_id": filename,
                 "error": f"PDF {filename} has already been processed and uploaded"
-            }
+            })
             return
 
-        # Insert source record first (we'll update chunk_count at the end)
-        source_data = {
-            "source_type": "pdf",
-            "source_id": filename,
-            "session_info": session_info,
-            "chunk_count": 0
-        }
-        source_result = await supabase.table("sources").insert(source_data).execute()
         source_uuid = source_result.data[0]["id"]
-        logger.info(f"[{job_id}] Source record created with ID: {source_uuid}")
+        logger.info("[%s] Source record created with ID: %s", job_id, source_uuid)
 
-        # Process PDF page by page and insert each embedding immediately
+        # Process PDF page by page, overlapping slide processing (vision +
+        # embedding) with Supabase inserts: the producer streams chunks into
+        # a bounded queue while a consumer drains it in small batches, so
+        # neither the LLM calls nor the DB connection idle on the other
         processor = SlideProcessor()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_MAXSIZE)
         chunk_count = 0
 
-        async for chunk in processor.stream_from_bytes(pdf_bytes, filename, session_info):
-            # Update job status with progress
-            upload_jobs[job_id]["message"] = f"Processing slide {chunk['page_num']}/{chunk['total_pages']}..."
-
-            # Insert embedding immediately
-            embedding_data = {
-                "source_id": source_uuid,
-                "text": chunk["text"],
-                "timestamp": chunk["timestamp"],
-                "embedding": chunk["embedding"]
-            }
-            await supabase.table("embeddings").insert(embedding_data).execute()
-            chunk_count += 1
-            upload_jobs[job_id]["chunk_count"] = chunk_count
+        async def insert_chunks():
+            nonlocal chunk_count
+            batch = []
+
+            async def flush():
+                nonlocal chunk_count
+                await supabase.table("embeddings").insert(batch).execute()
+                chunk_count += len(batch)
+                batch.clear()
+                await update_job(job_id, chunk_count=chunk_count)
+
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(queue.get(), timeout=INSERT_FLUSH_SECONDS)
+                except asyncio.TimeoutError:
+                    # Producer is mid-slide; flush the partial batch so
+                    # progress stays visible rather than waiting on it
+                    if batch:
+                        await flush()
+                    continue
+                if chunk is None:
+                    break
+                batch.append({
+                    "source_id": source_uuid,
+                    "text": chunk["text"],
+                    "timestamp": chunk["timestamp"],
+                    "embedding": chunk["embedding"]
+                })
+                if len(batch) >= INSERT_BATCH_SIZE:
+                    await flush()
+            if batch:
+                await flush()
+
+        consumer = asyncio.create_task(insert_chunks())
+        last_progress = 0.0
+
+        try:
+            async for chunk in processor.stream_from_path(pdf_path, filename, session_info):
+                # Pollers tolerate slightly stale progress; throttling the
+                # per-slide message keeps the producer loop off the jobs store
+                now = time.monotonic()
+                if now - last_progress >= PROGRESS_INTERVAL:
+                    last_progress = now
+                    await update_job(
+                        job_id, message=f"Processing slide {chunk['page_num']}/{chunk['total_pages']}..."
+                    )
+                # Race the put against the consumer so a full queue cannot
+                # deadlock the job if the insert side has failed
+                put = asyncio.ensure_future(queue.put(chunk))
+                await asyncio.wait({put, consumer}, return_when=asyncio.FIRST_COMPLETED)
+                if consumer.done():
+                    put.cancel()
+                    break
+
+            # The sentinel put needs the same race: the consumer can fail
+            # mid-flush with the queue still full
+            if not consumer.done():
+                put = asyncio.ensure_future(queue.put(None))
+                await asyncio.wait({put, consumer}, return_when=asyncio.FIRST_COMPLETED)
+                if not put.done():
+                    put.cancel()
+            # Surfaces any insert error through the handler below
+            await consumer
+        finally:
+            # Producer failed (or the insert side did): don't leave the
+            # consumer spinning on its flush timeout forever
+            if not consumer.done():
+                consumer.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await consumer
 
         # Update source record with final chunk count
         await supabase.table("sources").update({"chunk_count": chunk_count}).eq("id", source_uuid).execute()
 
-        logger.info(f"[{job_id}] Successfully completed processing {chunk_count} slides")
-        upload_jobs[job_id] = {
+        logger.info("[%s] Successfully completed processing %d slides", job_id, chunk_count)
+        await set_job(job_id, {
             "status": "completed",
             "message": f"Successfully processed {chunk_count} slides",
             "source_id": filename,
             "chunk_count": chunk_count
-        }
+        })
 
     except Exception as e:
-        logger.error(f"[{job_id}] Processing failed with error: {str(e)}", exc_info=True)
-        upload_jobs[job_id] = {
+        logger.error("[%s] Processing failed with error: %s", job_id, e, exc_info=True)
+
+        # Release the claimed source row (partial embeddings cascade with
+        # it) so a transient vision or insert failure doesn't block every
+        # retry of the same deck with "already processed"
+        if source_uuid is not None:
+            try:
+                await supabase.table("sources").delete(
+                    returning="minimal"
+                ).eq("id", source_uuid).execute()
+            except Exception:
+                logger.warning(
+                    "[%s] Could not release source row %s", job_id, source_uuid, exc_info=True
+                )
+
+        await set_job(job_id, {
             "status": "failed",
             "message": "Processing failed",
             "error": str(e)
-        }
+        })
+    finally:
+        # The spooled upload is only needed for this run
+        try:
+            os.unlink(pdf_path)
+        except OSError:
+            pass
 
 
 @router.post("/pdf", response_model=UploadResponse, dependencies=[Depends(verify_api_key)])
@@ -121,10 +222,19 @@ async def upload_pdf(
             detail="File must be a PDF"
         )
 
-    # Read file into memory
-    pdf_bytes = await file.read()
+    # Spool the upload to a temp file in bounded reads, so a large deck
+    # never has to fit in memory (and render workers read it from disk)
+    tmp = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    size = 0
+    try:
+        while chunk := await file.read(UPLOAD_READ_BYTES):
+            tmp.write(chunk)
+            size += len(chunk)
+    finally:
+        tmp.close()
 
-    if len(pdf_bytes) == 0:
+    if size == 0:
+        os.unlink(tmp.name)
         raise HTTPException(
             status_code=400,
             detail="Empty file uploaded"
@@ -134,15 +244,15 @@ async def upload_pdf(
     job_id = str(uuid.uuid4())
 
     # Initialize job status
-    upload_jobs[job_id] = {
+    await set_job(job_id, {
         "status": "processing",
         "message": "Starting PDF processing...",
         "source_id": file.filename,
         "source_type": "pdf"
-    }
+    })
 
     # Start background processing as async task
-    asyncio.create_task(process_pdf_upload(job_id, pdf_bytes, file.filename, session_info))
+    asyncio.create_task(process_pdf_upload(job_id, tmp.name, file.filename, session_info))
 
     return UploadResponse(
         job_id=job_id,
@@ -1,16 +1,23 @@
 """Shared source management routes."""
+import json
 import logging
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 
 from models import JobStatusResponse
 from clients import get_supabase, check_supabase_configured
-from . import upload_jobs, verify_api_key
+from clients.jobs import TERMINAL_STATES, get_job, wait_for_update
+from . import verify_api_key
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Longest a status stream waits for a change signal before re-reading the
+# job anyway (covers jobs processed by a different worker via Redis)
+STATUS_STREAM_POLL_SECONDS = 2.0
+
 
 @router.get("/status/{job_id}", response_model=JobStatusResponse)
 async def get_job_status(job_id: str):
@@ -28,13 +35,13 @@ async def get_job_status(job_id: str):
     - chunk_count: Number of chunks processed (if completed)
     - error: Error message (if failed)
     """
-    if job_id not in upload_jobs:
+    job = await get_job(job_id)
+    if job is None:
         raise HTTPException(
             status_code=404,
             detail=f"Job not found: {job_id}"
         )
 
-    job = upload_jobs[job_id]
     return JobStatusResponse(
         job_id=job_id,
         status=job.get("status", "unknown"),
@@ -45,13 +52,59 @@ async def get_job_status(job_id: str):
     )
 
 
+@router.get("/status-stream/{job_id}")
+async def stream_job_status(job_id: str):
+    """
+    Stream upload job status updates over Server-Sent Events.
+
+    Pushes the current record immediately and again on every change, then
+    closes once the job reaches a terminal status. One persistent
+    connection replaces the polling loop against /status/{job_id}.
+
+    Path parameters:
+    - job_id: The job ID returned from upload endpoint
+    """
+    job = await get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Job not found: {job_id}"
+        )
+
+    async def stream():
+        current = job
+        while True:
+            payload = json.dumps({"job_id": job_id, **current})
+            yield f"data: {payload}\n\n".encode("utf-8")
+            if current.get("status") in TERMINAL_STATES:
+                break
+            await wait_for_update(job_id, STATUS_STREAM_POLL_SECONDS)
+            current = await get_job(job_id) or current
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
 @router.get("/sources")
-async def list_sources(source_type: Optional[str] = Query(None, description="Filter by source type: youtube or pdf")):
+async def list_sources(
+    source_type: Optional[str] = Query(None, description="Filter by source type: youtube or pdf"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum sources to return"),
+    offset: int = Query(0, ge=0, description="Number of sources to skip"),
+):
     """
-    List all sources that have been processed.
+    List sources that have been processed, newest first.
 
     Query parameters:
     - source_type: Optional filter by type ("youtube" or "pdf")
+    - limit: Page size (default 50, max 500)
+    - offset: Page start
 
     Returns:
     - List of source records with source_id, session_info, and chunk_count
@@ -68,12 +121,16 @@ async def list_sources(source_type: Optional[str] = Query(None, description="Fil
         if source_type:
             query = query.eq("source_type", source_type)
 
-        result = await query.order("processed_at", desc=True).execute()
+        # Pagination keeps the payload bounded as the table grows; the
+        # covering index (idx_sources_type_time) serves the filter + order
+        result = await query.order("processed_at", desc=True).range(
+            offset, offset + limit - 1
+        ).execute()
 
-        logger.info(f"Found {len(result.data)} sources")
+        logger.info("Found %d sources", len(result.data))
         return {"sources": result.data}
     except Exception as e:
-        logger.error(f"Failed to fetch sources: {str(e)}", exc_info=True)
+        logger.error("Failed to fetch sources: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -88,30 +145,28 @@ async def delete_source(source_id: str):
     Returns:
     - Success message with deleted counts
     """
-    logger.debug(f"Deleting source: {source_id}")
+    logger.debug("Deleting source: %s", source_id)
     check_supabase_configured()
 
     try:
         supabase = await get_supabase()
 
-        # First delete associated embeddings (foreign key constraint)
-        embeddings_result = await supabase.table("embeddings").delete().eq(
-            "source_id", source_id
-        ).execute()
-        embeddings_deleted = len(embeddings_result.data) if embeddings_result.data else 0
-
-        # Then delete the source record
-        source_result = await supabase.table("sources").delete().eq(
-            "id", source_id
+        # One RPC (delete_source_cascade in SQL/initialize.sql) runs both
+        # deletes in a single transaction server-side: half the round trips,
+        # and no window where embeddings are gone but the source remains.
+        # It returns the embedding count, or NULL for an unknown source.
+        result = await supabase.rpc(
+            "delete_source_cascade", {"source_uuid": source_id}
         ).execute()
 
-        if not source_result.data:
+        if result.data is None:
             raise HTTPException(
                 status_code=404,
                 detail=f"Source not found: {source_id}"
             )
+        embeddings_deleted = result.data
 
-        logger.info(f"Deleted source {source_id} and {embeddings_deleted} embeddings")
+        logger.info("Deleted source %s and %d embeddings", source_id, embeddings_deleted)
         return {
             "message": "Source deleted successfully",
             "source_id": source_id,
@@ -120,5 +175,5 @@ async def delete_source(source_id: str):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Failed to delete source: {str(e)}", exc_info=True)
+        logger.error("Failed to delete source: %s", e, exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
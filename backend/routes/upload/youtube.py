@@ -7,111 +7,160 @@ from fastapi import APIRouter, Depends, HTTPException
 
 from models import YouTubeUploadRequest, UploadResponse
 from clients import get_supabase, check_supabase_configured
+from clients.jobs import set_job, update_job
+from clients.postgres import copy_embeddings, is_configured as postgres_configured
 from actions.transcribe_youtube import YouTubeTranscriber
-from . import upload_jobs, verify_api_key
+from . import verify_api_key
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Rows per embeddings INSERT; keeps request payloads under PostgREST limits
+INSERT_BATCH_SIZE = 500
 
-async def process_youtube_upload(job_id: str, request: YouTubeUploadRequest):
+# Insert batches in flight at once; overlaps PostgREST round-trip latency
+INSERT_CONCURRENCY = 8
+
+
+async def process_youtube_upload(job_id: str, request: YouTubeUploadRequest, video_id: str):
     """Background task to process YouTube video and save to Supabase."""
+    supabase = None
+    source_uuid = None
     try:
-        logger.info(f"[{job_id}] Starting YouTube upload for URL: {request.url}")
-
-        # Extract video ID first
-        video_id = YouTubeTranscriber.extract_video_id(request.url)
-        if not video_id:
-            logger.error(f"[{job_id}] Could not extract video ID from URL: {request.url}")
-            upload_jobs[job_id] = {
-                "status": "failed",
-                "message": "Could not extract video ID from URL",
-                "error": f"Invalid YouTube URL: {request.url}"
-            }
-            return
+        logger.info("[%s] Starting YouTube upload for video %s", job_id, video_id)
 
-        logger.info(f"[{job_id}] Extracted video ID: {video_id}")
-        upload_jobs[job_id]["source_id"] = video_id
-        upload_jobs[job_id]["message"] = "Checking if video already exists..."
+        await update_job(job_id, message="Checking if video already exists...")
 
         # Connect to Supabase
-        logger.debug(f"[{job_id}] Connecting to Supabase...")
+        logger.debug("[%s] Connecting to Supabase...", job_id)
         supabase = await get_supabase()
 
-        # Check if already processed
-        logger.debug(f"[{job_id}] Checking if video already exists in sources table...")
-        existing = await supabase.table("sources").select("id").eq(
-            "source_type", "youtube"
-        ).eq("source_id", video_id).execute()
-        logger.debug(f"[{job_id}] Existing check result: {existing.data}")
-
-        if existing.data:
-            logger.warning(f"[{job_id}] Video {video_id} already processed")
-            upload_jobs[job_id] = {
-                "status": "failed",
-                "message": "Video already processed",
-                "source_id": video_id,
-                "error": f"Video {video_id} has already been transcribed and uploaded"
-            }
-            return
-
-        upload_jobs[job_id]["message"] = "Fetching transcript and creating embeddings..."
-        logger.info(f"[{job_id}] Fetching transcript and creating embeddings...")
-
-        # Transcribe and embed
+        # Start transcription right away; the source-row claim below is one
+        # Supabase round trip that can run while the transcript downloads.
+        # Duplicates are rare, so the occasional cancelled fetch is cheap.
         transcriber = YouTubeTranscriber(
             chunk_size=request.chunk_size,
             overlap=request.overlap,
             language=request.language
         )
-        chunks = await transcriber.transcribe(request.url, request.session_info, save_local=False)
-        logger.info(f"[{job_id}] Transcription complete. Got {len(chunks)} chunks")
-
-        upload_jobs[job_id]["message"] = "Saving to Supabase..."
-        upload_jobs[job_id]["chunk_count"] = len(chunks)
+        transcribe_task = asyncio.create_task(
+            transcriber.transcribe(request.url, request.session_info, save_local=False)
+        )
 
-        # Insert source record
-        logger.debug(f"[{job_id}] Inserting source record...")
+        # Claim the source row up front: the UNIQUE(source_type, source_id)
+        # constraint makes this atomic, so it replaces the duplicate-check
+        # SELECT and races cleanly under concurrent ingestion
         source_data = {
             "source_type": "youtube",
             "source_id": video_id,
             "session_info": request.session_info,
-            "chunk_count": len(chunks)
+            "chunk_count": 0
         }
-        logger.debug(f"[{job_id}] Source data: {source_data}")
-        source_result = await supabase.table("sources").insert(source_data).execute()
-        logger.debug(f"[{job_id}] Source insert result: {source_result.data}")
+        try:
+            source_result = await supabase.table("sources").upsert(
+                source_data, on_conflict="source_type,source_id", ignore_duplicates=True
+            ).execute()
+        except Exception:
+            transcribe_task.cancel()
+            raise
+
+        if not source_result.data:
+            transcribe_task.cancel()
+            logger.warning("[%s] Video %s already processed", job_id, video_id)
+            await set_job(job_id, {
+                "status": "failed",
+                "message": "Video already processed",
+                "source_id": video_id,
+                "error": f"Video {video_id} has already been transcribed and uploaded"
+            })
+            return
 
         source_uuid = source_result.data[0]["id"]
-        logger.info(f"[{job_id}] Source record created with ID: {source_uuid}")
-
-        # Insert embeddings
-        logger.info(f"[{job_id}] Inserting {len(chunks)} embeddings...")
-        for i, chunk in enumerate(chunks):
-            embedding_data = {
-                "source_id": source_uuid,
-                "text": chunk["text"],
-                "timestamp": chunk["timestamp"],
-                "embedding": chunk["embedding"]
-            }
-            logger.debug(f"[{job_id}] Inserting embedding {i+1}/{len(chunks)}")
-            await supabase.table("embeddings").insert(embedding_data).execute()
-
-        logger.info(f"[{job_id}] Successfully completed processing {len(chunks)} chunks")
-        upload_jobs[job_id] = {
+        logger.info("[%s] Source record created with ID: %s", job_id, source_uuid)
+
+        await update_job(job_id, message="Fetching transcript and creating embeddings...")
+        logger.info("[%s] Fetching transcript and creating embeddings...", job_id)
+
+        chunks = await transcribe_task
+        logger.info("[%s] Transcription complete. Got %d chunks", job_id, len(chunks))
+
+        await update_job(job_id, message="Saving to Supabase...", chunk_count=len(chunks))
+
+        logger.info("[%s] Inserting %d embeddings...", job_id, len(chunks))
+
+        if postgres_configured():
+            # Binary COPY over a direct connection: one round trip, and the
+            # server parses neither JSON nor text-format vectors
+            await copy_embeddings([
+                (uuid.UUID(source_uuid), chunk["text"], chunk["timestamp"], chunk["embedding"])
+                for chunk in chunks
+            ])
+        else:
+            # Fall back to multi-row INSERTs via PostgREST, batched to stay
+            # under payload limits on long videos. Batches run concurrently
+            # under a semaphore so their round-trips overlap; gather fails
+            # fast and the surrounding handler marks the job failed.
+            embedding_rows = [
+                {
+                    "source_id": source_uuid,
+                    "text": chunk["text"],
+                    "timestamp": chunk["timestamp"],
+                    "embedding": chunk["embedding"]
+                }
+                for chunk in chunks
+            ]
+
+            insert_sem = asyncio.Semaphore(INSERT_CONCURRENCY)
+            inserted = 0
+
+            async def _insert_batch(batch: list[dict]):
+                nonlocal inserted
+                async with insert_sem:
+                    await supabase.table("embeddings").insert(batch).execute()
+                inserted += len(batch)
+                await update_job(
+                    job_id, message=f"Saving to Supabase... ({inserted}/{len(embedding_rows)})"
+                )
+
+            await asyncio.gather(*[
+                _insert_batch(embedding_rows[start:start + INSERT_BATCH_SIZE])
+                for start in range(0, len(embedding_rows), INSERT_BATCH_SIZE)
+            ])
+
+        # Record the final chunk count on the claimed source row
+        await supabase.table("sources").update(
+            {"chunk_count": len(chunks)}
+        ).eq("id", source_uuid).execute()
+
+        logger.info("[%s] Successfully completed processing %d chunks", job_id, len(chunks))
+        await set_job(job_id, {
             "status": "completed",
             "message": f"Successfully processed {len(chunks)} chunks",
             "source_id": video_id,
             "chunk_count": len(chunks)
-        }
+        })
 
     except Exception as e:
-        logger.error(f"[{job_id}] Processing failed with error: {str(e)}", exc_info=True)
-        upload_jobs[job_id] = {
+        logger.error("[%s] Processing failed with error: %s", job_id, e, exc_info=True)
+
+        # Release the claimed source row (embeddings cascade with it) so a
+        # failed upload - e.g. a video without captions - can be retried
+        # instead of hitting "already processed" forever
+        if source_uuid is not None:
+            try:
+                await supabase.table("sources").delete(
+                    returning="minimal"
+                ).eq("id", source_uuid).execute()
+            except Exception:
+                logger.warning(
+                    "[%s] Could not release source row %s", job_id, source_uuid, exc_info=True
+                )
+
+        await set_job(job_id, {
             "status": "failed",
             "message": "Processing failed",
             "error": str(e)
-        }
+        })
 
 
 @router.post("/youtube", response_model=UploadResponse, dependencies=[Depends(verify_api_key)])
@@ -150,15 +199,17 @@ async def upload_youtube(request: YouTubeUploadRequest):
     job_id = str(uuid.uuid4())
 
     # Initialize job status
-    upload_jobs[job_id] = {
+    await set_job(job_id, {
         "status": "processing",
         "message": "Starting transcription...",
         "source_id": video_id,
         "source_type": "youtube"
-    }
+    })
 
     # Start background processing as async task
-    asyncio.create_task(process_youtube_upload(job_id, request))
+    # The handler already validated and extracted the ID; pass it through
+    # rather than re-parsing the URL in the background task
+    asyncio.create_task(process_youtube_upload(job_id, request, video_id))
 
     return UploadResponse(
         job_id=job_id,
@@ -0,0 +1,235 @@
+"""
+Local fallback search over bundled embeddings.
+
+When Supabase is not configured, RAGService falls back to searching the
+newest bundle produced by `actions.bundle` in-process. The whole corpus is
+held as a single L2-normalized float32 matrix so ranking a query is one
+matrix-vector product instead of a Python-level loop over rows.
+"""
+
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    # Optional: hardware-aware SIMD kernels (AVX-512/NEON) for the cosine scan
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    # Optional: approximate nearest-neighbor index built by actions.bundle
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+# Below this corpus size brute-force matmul beats the HNSW graph traversal
+HNSW_MIN_CORPUS = 1000
+HNSW_EF = 50
+
+from actions.bundle import BUNDLED_DIR, BUNDLE_FILE_PATTERN, BUNDLE_META_PATTERN
+
+# Lazily loaded corpus: (embedding matrix, per-row inverse norms, per-row metadata)
+_corpus: Optional[Tuple[np.ndarray, Optional[np.ndarray], List[Dict[str, Any]]]] = None
+# Bundle paths the cached corpus was loaded from
+_corpus_key: Optional[Tuple[Optional[Path], Path]] = None
+# Lazily loaded HNSW index and the matrix path it belongs to
+_hnsw: Optional[Tuple[Any, Path]] = None
+
+
+def cosine_similarity(vec1, vec2) -> float:
+    """
+    Cosine similarity between two vectors.
+
+    Scalar fallback for callers outside the batched matmul path. Uses the
+    single-sqrt `np.vdot` form, which avoids the dispatch overhead of two
+    `np.linalg.norm` calls.
+    """
+    a = np.asarray(vec1, dtype=np.float32)
+    b = np.asarray(vec2, dtype=np.float32)
+    return float(np.dot(a, b) / np.sqrt(np.vdot(a, a) * np.vdot(b, b)))
+
+
+@lru_cache(maxsize=1)
+def _resolve_bundle(mtime_ns: int) -> Tuple[Optional[Path], Path]:
+    """Scan the bundled directory once per directory mtime."""
+    split_bundles = [
+        (int(match.group(1)), path)
+        for path in BUNDLED_DIR.glob("bundle-*-meta.json")
+        if (match := BUNDLE_META_PATTERN.match(path.name))
+    ]
+    legacy_bundles = [
+        (int(match.group(1)), path)
+        for path in BUNDLED_DIR.glob("bundle-*.json")
+        if (match := BUNDLE_FILE_PATTERN.match(path.name))
+    ]
+
+    if split_bundles and (not legacy_bundles or max(split_bundles)[0] >= max(legacy_bundles)[0]):
+        bundle_idx, meta_path = max(split_bundles)
+        return meta_path.with_name(f"bundle-{bundle_idx}.npy"), meta_path
+    if legacy_bundles:
+        return None, max(legacy_bundles)[1]
+
+    raise FileNotFoundError(
+        f"No embedding bundles found in {BUNDLED_DIR}. "
+        "Run 'python -m actions.bundle' to create one."
+    )
+
+
+def latest_bundle_paths() -> Tuple[Optional[Path], Path]:
+    """
+    Find the newest bundle, preferring the .npy matrix + metadata format.
+
+    The directory scan is cached against the directory mtime (one cheap stat
+    per call), so a new bundle invalidates the cache automatically.
+
+    Returns:
+        Tuple of (matrix path or None for legacy JSON bundles, metadata path)
+    """
+    try:
+        mtime_ns = BUNDLED_DIR.stat().st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(
+            f"No embedding bundles found in {BUNDLED_DIR}. "
+            "Run 'python -m actions.bundle' to create one."
+        )
+    return _resolve_bundle(mtime_ns)
+
+
+def _record_metadata(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize a bundle record into the shape search results use."""
+    session_info = record.get("session_info") or f"{record.get('year')}-{record.get('month')} meeting"
+    timestamp = record.get("timestamp") or f"Slide {record.get('slide', '?')}"
+    return {
+        "text": record.get("text", ""),
+        "timestamp": str(timestamp),
+        "session_info": session_info,
+    }
+
+
+def load_corpus() -> Tuple[np.ndarray, Optional[np.ndarray], List[Dict[str, Any]]]:
+    """
+    Load (and cache) the bundled corpus.
+
+    The .npy matrix is memory-mapped so the OS page cache backs it and no
+    full in-memory copy is made at startup; per-row inverse norms are kept
+    as a separate small float32 vector instead of rescaling the matrix.
+
+    Returns:
+        Tuple of (embedding matrix, per-row inverse norms, list of metadata dicts)
+    """
+    global _corpus, _corpus_key
+    paths = latest_bundle_paths()
+    if _corpus is None or _corpus_key != paths:
+        matrix_path, meta_path = paths
+        with meta_path.open("r", encoding="utf-8") as file:
+            records = json.load(file)
+
+        if matrix_path is not None:
+            matrix = np.load(matrix_path, mmap_mode="r")
+        else:
+            matrix = np.asarray([record["embedding"] for record in records], dtype=np.float32)
+
+        # Accumulate in float32 so float16 rows neither overflow nor get copied
+        norms = np.sqrt(np.einsum("ij,ij->i", matrix, matrix, dtype=np.float32))
+        if np.allclose(norms, 1.0, atol=1e-2):
+            # Bundle was normalized at write time: cosine is a plain dot product
+            inv_norms = None
+        else:
+            inv_norms = np.where(norms > 0, 1.0 / norms, 0.0).astype(np.float32)
+
+        _corpus = (matrix, inv_norms, [_record_metadata(record) for record in records])
+        _corpus_key = paths
+    return _corpus
+
+
+def _load_hnsw(matrix_path: Optional[Path], dim: int):
+    """Load (and cache) the HNSW index saved next to the bundle, if any."""
+    global _hnsw
+    if hnswlib is None or matrix_path is None:
+        return None
+    index_path = matrix_path.with_suffix(".hnsw")
+    if not index_path.exists():
+        return None
+    if _hnsw is None or _hnsw[1] != index_path:
+        index = hnswlib.Index(space="cosine", dim=dim)
+        index.load_index(str(index_path))
+        index.set_ef(HNSW_EF)
+        _hnsw = (index, index_path)
+    return _hnsw[0]
+
+
+def search(query_embedding: List[float], top_k: int = 5, session_filter: str = None) -> List[Dict]:
+    """
+    Rank bundled chunks against a query embedding by cosine similarity.
+
+    Args:
+        query_embedding: Embedding vector for the query
+        top_k: Number of top results to return
+        session_filter: Optional substring filter on session_info
+
+    Returns:
+        List of top matching results with scores, matching the Supabase
+        search result shape (text, timestamp, session_info, score)
+    """
+    matrix, inv_norms, metadata = load_corpus()
+
+    query = np.asarray(query_embedding, dtype=np.float32)
+    query_norm = np.linalg.norm(query)
+    if query_norm > 0:
+        query = query / query_norm
+
+    # Sub-linear HNSW path: only without a filter, and only once the corpus
+    # is large enough that graph traversal beats the brute-force matmul
+    if session_filter is None and matrix.shape[0] >= HNSW_MIN_CORPUS:
+        index = _load_hnsw(_corpus_key[0], matrix.shape[1])
+        if index is not None:
+            labels, distances = index.knn_query(query.reshape(1, -1), k=min(top_k, matrix.shape[0]))
+            return [
+                {**metadata[int(idx)], "score": float(1.0 - dist)}
+                for idx, dist in zip(labels[0], distances[0])
+            ]
+
+    if simsimd is not None and matrix.dtype in (np.float16, np.float32):
+        # SimSIMD requires matching dtypes; cast the query down to the
+        # matrix's precision. int8 bundles fall through to the matmul,
+        # which folds their norms in via inv_norms.
+        distances = simsimd.cdist(
+            query.astype(matrix.dtype, copy=False).reshape(1, -1),
+            np.ascontiguousarray(matrix),
+            metric="cosine",
+        )
+        scores = 1.0 - np.asarray(distances, dtype=np.float32).ravel()
+    else:
+        # Query is unit-norm; corpus norms (if any) are folded in via inv_norms
+        scores = matrix @ query
+        if inv_norms is not None:
+            scores *= inv_norms
+
+    if session_filter:
+        needle = session_filter.lower()
+        keep = np.fromiter(
+            (needle in row["session_info"].lower() for row in metadata),
+            dtype=bool,
+            count=len(metadata),
+        )
+        indices = np.flatnonzero(keep)
+    else:
+        indices = np.arange(scores.size)
+
+    if indices.size == 0:
+        return []
+
+    # O(N) partition for the top k, then sort only those k by score
+    candidate_scores = scores[indices]
+    k = min(top_k, indices.size)
+    top = np.argpartition(-candidate_scores, k - 1)[:k]
+    top_indices = indices[top[np.argsort(-candidate_scores[top])]]
+
+    return [
+        {**metadata[idx], "score": float(scores[idx])}
+        for idx in top_indices
+    ]
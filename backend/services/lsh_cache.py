@@ -0,0 +1,126 @@
+"""
+LSH-bucketed cache for retrieval results.
+
+Query embeddings are hashed to a bucket by the signs of random
+projections, so a lookup only scans the handful of entries whose
+signatures collide instead of every cached query. Candidates are then
+verified with an exact cosine check to bound false positives. Entries
+carry a TTL (new uploads change the corpus) and the cache is capped,
+evicting oldest-first.
+"""
+
+import time
+from collections import deque
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    # Optional: JIT-compiled signature kernel; NumPy's generic dispatch
+    # dominates the cost of these tiny (nbits x dim) products
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Random projections per signature; 16 bits spreads queries over 65k buckets
+SIGNATURE_BITS = 16
+
+# Minimum cosine similarity for a bucket collision to count as a hit
+SIMILARITY_THRESHOLD = 0.95
+
+# Seconds a cached result set stays valid
+TTL_SECONDS = 300
+
+# Maximum cached result sets
+MAX_ENTRIES = 5000
+
+
+if njit is not None:
+    @njit('i8(f4[:, ::1], f4[::1])', fastmath=True, cache=True)
+    def _compute_signature(planes, vec):
+        signature = 0
+        for i in range(planes.shape[0]):
+            dot = 0.0
+            for j in range(planes.shape[1]):
+                dot += planes[i, j] * vec[j]
+            if dot > 0.0:
+                signature |= 1 << i
+        return signature
+else:
+    def _compute_signature(planes, vec):
+        bits = planes @ vec > 0
+        return int(bits @ (1 << np.arange(bits.shape[0], dtype=np.int64)))
+
+
+class LSHCache:
+    """Approximate cache mapping query embeddings to retrieval results."""
+
+    def __init__(
+        self,
+        dim: int = 1536,
+        nbits: int = SIGNATURE_BITS,
+        threshold: float = SIMILARITY_THRESHOLD,
+        ttl: float = TTL_SECONDS,
+        max_entries: int = MAX_ENTRIES,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # Fixed seed so signatures are stable across instances and restarts;
+        # C-contiguous float32 to match the compiled kernel's layout
+        rng = np.random.default_rng(0)
+        self._planes = np.ascontiguousarray(
+            rng.standard_normal((nbits, dim)), dtype=np.float32
+        )
+
+        # signature -> [normalized vec, scope, results, expiry], oldest first
+        self._table: Dict[int, List[list]] = {}
+        self._order: deque = deque()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.sqrt(np.vdot(vec, vec)))
+        return vec / norm if norm > 0 else vec
+
+    def _signature(self, vec: np.ndarray) -> int:
+        return int(_compute_signature(self._planes, np.ascontiguousarray(vec)))
+
+    def get(self, embedding: List[float], scope: Hashable = None) -> Optional[Any]:
+        """Return cached results for a near-duplicate query, or None.
+
+        `scope` distinguishes otherwise-identical queries with different
+        parameters (top_k, session filter).
+        """
+        bucket = self._table.get(self._signature(self._normalize(embedding)))
+        if not bucket:
+            return None
+
+        vec = self._normalize(embedding)
+        now = time.monotonic()
+        for entry_vec, entry_scope, results, expires in bucket:
+            if expires <= now or entry_scope != scope:
+                continue
+            if float(np.dot(entry_vec, vec)) >= self.threshold:
+                return results
+        return None
+
+    def put(self, embedding: List[float], results: Any, scope: Hashable = None) -> None:
+        """Cache results for a query embedding."""
+        vec = self._normalize(embedding)
+        signature = self._signature(vec)
+
+        entry = [vec, scope, results, time.monotonic() + self.ttl]
+        self._table.setdefault(signature, []).append(entry)
+        self._order.append(signature)
+
+        # Evict oldest insertions once over the cap; per-signature buckets
+        # are appended in insertion order, so popping the head matches
+        while len(self._order) > self.max_entries:
+            oldest = self._order.popleft()
+            bucket = self._table.get(oldest)
+            if bucket:
+                bucket.pop(0)
+                if not bucket:
+                    del self._table[oldest]
@@ -1,6 +1,8 @@
 from typing import List, Dict
 
 from clients import get_supabase, get_embedding
+from clients.supabase import is_configured as supabase_configured
+from services import local_search
 
 
 class RAGService:
@@ -48,6 +50,11 @@ class RAGService:
             List of top matching results with scores
         """
         query_embedding = await get_embedding(query)
+
+        if not supabase_configured():
+            # No Supabase: rank the local bundle with a single matmul
+            return local_search.search(query_embedding, top_k, session_filter)
+
         supabase = await get_supabase()
 
         # Build RPC params
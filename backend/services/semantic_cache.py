@@ -0,0 +1,127 @@
+"""
+Semantic response cache for the chat endpoint.
+
+Caches full streamed answers keyed by the question's embedding. A lookup
+is one matrix-vector product over L2-normalized float32 rows, so a
+near-duplicate question (cosine similarity above the threshold) skips
+retrieval and answer synthesis entirely and costs only the embedding
+call. Entries expire after a TTL and the cache is capped, evicting the
+least recently used entry when full.
+"""
+
+import asyncio
+import time
+from typing import List, Optional
+
+import numpy as np
+
+# Minimum cosine similarity for a cached answer to count as a hit
+SIMILARITY_THRESHOLD = 0.95
+
+# Seconds a cached answer stays valid (new uploads change the corpus)
+TTL_SECONDS = 300
+
+# Maximum number of cached answers
+MAX_ENTRIES = 2000
+
+# Rows added per matrix growth; amortizes reallocation across inserts
+GROWTH_ROWS = 256
+
+
+class SemanticCache:
+    """Embedding-similarity cache mapping questions to streamed answers."""
+
+    def __init__(
+        self,
+        threshold: float = SIMILARITY_THRESHOLD,
+        ttl: float = TTL_SECONDS,
+        max_entries: int = MAX_ENTRIES,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # Structure-of-arrays: one contiguous matrix for the BLAS lookup,
+        # parallel lists for the payloads. The matrix is overallocated in
+        # GROWTH_ROWS blocks; rows [0:len(self._answers)] are live.
+        self._buffer: Optional[np.ndarray] = None
+        self._answers: List[str] = []
+        self._touched: List[float] = []
+        self._lock = asyncio.Lock()
+
+    @property
+    def _embeddings(self) -> Optional[np.ndarray]:
+        """View of the live rows, or None when empty."""
+        if not self._answers:
+            return None
+        return self._buffer[:len(self._answers)]
+
+    def _append_row(self, row: np.ndarray) -> None:
+        """Append a normalized row, growing the buffer in blocks."""
+        size = len(self._answers)
+        if self._buffer is None or size == self._buffer.shape[0]:
+            grown = np.empty(
+                (size + GROWTH_ROWS, row.shape[0]), dtype=np.float32
+            )
+            if size:
+                grown[:size] = self._buffer[:size]
+            self._buffer = grown
+        self._buffer[size] = row
+
+    def _delete_row(self, index: int) -> None:
+        """Shift live rows down over a deleted one (caller trims the lists)."""
+        size = len(self._answers)
+        self._buffer[index:size - 1] = self._buffer[index + 1:size]
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.sqrt(np.vdot(vec, vec)))
+        return vec / norm if norm > 0 else vec
+
+    def _evict_expired(self, now: float) -> None:
+        """Drop entries older than the TTL (caller holds the lock)."""
+        if not self._answers:
+            return
+        keep = [i for i, t in enumerate(self._touched) if now - t < self.ttl]
+        if len(keep) == len(self._touched):
+            return
+        if keep:
+            self._buffer[:len(keep)] = self._buffer[keep]
+        self._answers = [self._answers[i] for i in keep]
+        self._touched = [self._touched[i] for i in keep]
+
+    async def get(self, embedding: List[float]) -> Optional[str]:
+        """Return the cached answer for a similar question, or None."""
+        async with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+            if self._embeddings is None:
+                return None
+
+            scores = self._embeddings @ self._normalize(embedding)
+            best = int(np.argmax(scores))
+            if float(scores[best]) < self.threshold:
+                return None
+
+            self._touched[best] = now
+            return self._answers[best]
+
+    async def put(self, embedding: List[float], answer: str) -> None:
+        """Cache an answer, evicting the least recently used entry if full."""
+        if not answer:
+            return
+
+        async with self._lock:
+            now = time.monotonic()
+            self._evict_expired(now)
+
+            if self._answers and len(self._answers) >= self.max_entries:
+                oldest = min(range(len(self._touched)), key=self._touched.__getitem__)
+                self._delete_row(oldest)
+                del self._answers[oldest]
+                del self._touched[oldest]
+
+            self._append_row(self._normalize(embedding))
+            self._answers.append(answer)
+            self._touched.append(now)
@@ -41,11 +41,28 @@ class StreamingMeetingNotesAgent:
         self.model = model
         self.enable_web_search = enable_web_search
         self.eventbrite_service = EventbriteService()
-        # Load prompt from file and inject current date
-        prompt_template = load_prompt()
-        self.instructions = prompt_template.format(
-            current_date=datetime.now().strftime('%d %B %Y')
-        )
+
+        # Load the prompt once; the current date is injected per day in
+        # _current_instructions so instances can live across midnight
+        self.prompt_template = load_prompt()
+        self._instructions_date: str | None = None
+        self._instructions: str | None = None
+
+        # Tools are stateless closures over the services, so they are built
+        # once here instead of on every stream_answer call
+        self.tools = [self._create_search_tool()]
+        if self.enable_web_search:
+            self.tools.append(WebSearchTool())
+        if eventbrite_configured():
+            self.tools.append(self._create_eventbrite_tool())
+
+    def _current_instructions(self) -> str:
+        """Instructions with today's date injected (re-rendered once per day)."""
+        today = datetime.now().strftime('%d %B %Y')
+        if self._instructions_date != today:
+            self._instructions = self.prompt_template.format(current_date=today)
+            self._instructions_date = today
+        return self._instructions
 
     def _create_search_tool(self):
         """Create the search tool function for the agent"""
@@ -210,19 +227,8 @@ class StreamingMeetingNotesAgent:
         Yields:
             Tuple of (chunk_type, data) where chunk_type is 'trace_id' or 'text'
         """
-        # Create tools list
-        tools = [self._create_search_tool()]
-
-        # Add web search tool if enabled
-        if self.enable_web_search:
-            tools.append(WebSearchTool())
-
-        # Add eventbrite tool if configured
-        if eventbrite_configured():
-            tools.append(self._create_eventbrite_tool())
-
         # Build instructions with conversation history injected
-        instructions = self.instructions
+        instructions = self._current_instructions()
         if messages and len(messages) > 0:
             # Inject conversation history into instructions for context
             history_text = "\n\nConversation history:\n"
@@ -230,13 +236,13 @@ class StreamingMeetingNotesAgent:
                 role = msg.get("role", "unknown")
                 content = msg.get("content", "")
                 history_text += f"{role.capitalize()}: {content}\n"
-            instructions = self.instructions + history_text
+            instructions = instructions + history_text
 
         agent = Agent(
             name="Carrie",
             instructions=instructions,
             model=self.model,
-            tools=tools,
+            tools=self.tools,
         )
 
         # Stream events from agent